@@ -0,0 +1,82 @@
+from anyio import to_thread
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from app.core.password_hasher import password_hasher
+from app.database import async_engine
+from services import fmp_service, metrics
+from services.quota import fmp_quota
+from services.watchlist_cache import watchlist_cache
+
+router = APIRouter()
+
+def _cache_metrics():
+    service_stats = fmp_service.get_service_stats()
+    caches = [("api", service_stats["cache"]), ("negative", service_stats["negative_cache"]), ("watchlist", watchlist_cache.stats())]
+    if "local" in service_stats["cache"]:
+        caches.append(("api_local", service_stats["cache"]["local"]))
+
+    families = []
+    for field, metric_type, help_text in (
+        ("hits", "counter", "Cache lookups that found a fresh entry."),
+        ("misses", "counter", "Cache lookups that found nothing fresh."),
+        ("evictions", "counter", "Entries evicted to stay within the cache's size limits."),
+        ("expirations", "counter", "Lookups that found an entry past its TTL."),
+        ("entries", "gauge", "Entries currently held."),
+        ("bytes", "gauge", "Approximate bytes currently held."),
+    ):
+        name = f"cache_{field}_total" if metric_type == "counter" else f"cache_{field}"
+        families.append((name, metric_type, help_text, [({"cache": cache}, stats[field]) for cache, stats in caches]))
+    return families
+
+def _quota_metrics():
+    stats = fmp_quota.stats()
+    return [
+        ("fmp_quota_granted_total", "counter", "FMP quota tokens granted, by priority.",
+         [({"priority": level}, count) for level, count in stats["granted"].items()]),
+        ("fmp_quota_rejected_total", "counter", "FMP calls refused locally because the quota was spent or throttled, by priority.",
+         [({"priority": level}, count) for level, count in stats["rejected"].items()]),
+        ("fmp_circuit_open", "gauge", "1 while FMP throttling has tripped the circuit breaker.",
+         [({}, int(stats["circuit"] != "closed"))]),
+    ]
+
+def _db_pool_metrics():
+    pool = async_engine.pool
+    if not hasattr(pool, "checkedout"):
+        return []  # e.g. a NullPool has nothing to report
+    return [
+        ("db_pool_size", "gauge", "Configured size of the async database connection pool.", [({}, pool.size())]),
+        ("db_pool_checked_out", "gauge", "Connections currently in use.", [({}, pool.checkedout())]),
+        ("db_pool_checked_in", "gauge", "Idle connections in the pool.", [({}, pool.checkedin())]),
+        ("db_pool_overflow", "gauge", "Connections open beyond pool_size (negative while the pool is still filling).", [({}, pool.overflow())]),
+    ]
+
+def _threadpool_metrics():
+    # The limiter that bounds Starlette's run_in_threadpool and sync endpoints
+    limiter = to_thread.current_default_thread_limiter()
+    return [
+        ("threadpool_max_threads", "gauge", "Threads available to sync endpoints and run_in_threadpool.", [({}, limiter.total_tokens)]),
+        ("threadpool_busy_threads", "gauge", "Threads currently running work.", [({}, limiter.borrowed_tokens)]),
+        ("threadpool_waiting_tasks", "gauge", "Calls waiting for a free thread.", [({}, limiter.statistics().tasks_waiting)]),
+    ]
+
+def _password_hasher_metrics():
+    stats = password_hasher.stats()
+    return [
+        ("password_hash_in_flight", "gauge", "bcrypt operations running or queued in the hashing pool.", [({}, stats["in_flight"])]),
+        ("password_hash_completed_total", "counter", "bcrypt operations the hashing pool finished successfully.", [({}, stats["completed"])]),
+        ("password_hash_failed_total", "counter", "bcrypt operations that raised or lost their worker twice.", [({}, stats["failed"])]),
+        ("password_hash_rejected_total", "counter", "bcrypt operations refused with 503 because the pool was saturated.", [({}, stats["rejected"])]),
+    ]
+
+for collector in (_cache_metrics, _quota_metrics, _db_pool_metrics, _threadpool_metrics, _password_hasher_metrics):
+    metrics.registry.add_collector(collector)
+
+# ENDPOINT FOR PROMETHEUS METRICS
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """
+    Route latency, FMP upstream, cache, database pool and threadpool metrics for this
+    worker, in the Prometheus text exposition format.
+    """
+    return Response(content=metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import ORJSONResponse, PlainTextResponse
+
+from services import profiling
+
+router = APIRouter()
+
+def require_profiling_token(x_profile: str | None = Header(None)):
+    """
+    Profiles expose internals, so reading them needs the same token that triggers them.
+    """
+    if not profiling.is_valid_token(x_profile):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="A valid X-Profile token is required (set PROFILING_TOKEN to enable)."
+        )
+
+def _get_profile(profile_id: str) -> profiling.RequestProfile:
+    profile = profiling.profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Profile '{profile_id}' not found; only the last {profiling.PROFILING_MAX_PROFILES} are kept."
+        )
+    return profile
+
+# ENDPOINT FOR LISTING STORED PROFILES
+@router.get("/", dependencies=[Depends(require_profiling_token)])
+async def list_profiles():
+    """
+    Summaries of the stored request profiles (this worker only), newest first.
+    """
+    return [profile.summary() for profile in reversed(profiling.profile_store.list())]
+
+# ENDPOINT FOR DOWNLOADING ONE PROFILE
+@router.get("/{profile_id}", dependencies=[Depends(require_profiling_token)])
+async def download_profile(profile_id: str):
+    """
+    Phase breakdown and stack samples for one profiled request, as a JSON download.
+    """
+    profile = _get_profile(profile_id)
+    return ORJSONResponse(
+        {**profile.summary(), "stacks": dict(profile.samples.most_common())},
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile.id}.json"'},
+    )
+
+# ENDPOINT FOR DOWNLOADING ONE PROFILE AS A FLAME GRAPH INPUT
+@router.get("/{profile_id}/folded", dependencies=[Depends(require_profiling_token)])
+async def download_folded_stacks(profile_id: str):
+    """
+    Stack samples in collapsed-stack format, for flamegraph.pl or speedscope.
+    """
+    profile = _get_profile(profile_id)
+    return PlainTextResponse(
+        profile.folded_stacks(),
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile.id}.folded"'},
+    )
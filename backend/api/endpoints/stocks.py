@@ -1,7 +1,18 @@
-from fastapi import APIRouter, HTTPException, status
-from services import fmp_service
-import requests
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from services import fmp_service, profiling
+from services import history_export
+from services import indicators as indicator_engine
+from services.price_history import normalize_interval
+from services.quote_stream import quote_hub
+from services.records import CompanyProfile, KeyMetrics, Quote
+import numpy as np
+import httpx
+import asyncio
+import hashlib
+import json
 import logging
+import os
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -9,37 +20,69 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+MAX_BATCH_SYMBOLS = 200
+SNAPSHOT_PART_TIMEOUT_SECONDS = float(os.getenv("SNAPSHOT_PART_TIMEOUT_SECONDS", "8"))
+MAX_INDICATORS_PER_REQUEST = 10
+QUOTE_STREAM_HEARTBEAT_SECONDS = 15
+
+def _matches_if_none_match(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {candidate.strip().removeprefix("W/") for candidate in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+def _conditional_response(request: Request, cache_keys: list[tuple], build_payload) -> Response:
+    """
+    Serializes build_payload() with orjson. When every cache entry the response is built
+    from is cached, adds an ETag derived from their versions and a max-age matching their
+    remaining TTL, and answers a matching If-None-Match with 304 without building the payload.
+    """
+    freshness = fmp_service.cache_freshness(cache_keys)
+    if freshness is None:
+        return _render(build_payload, {"Cache-Control": "no-cache"})
+
+    versions, max_age = freshness
+    fingerprint = repr((request.url.path, sorted(request.query_params.multi_items()), versions))
+    etag = f'"{hashlib.blake2b(fingerprint.encode(), digest_size=12).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": f"private, max-age={max_age}"}
+    if _matches_if_none_match(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return _render(build_payload, headers)
+
+def _render(build_payload, headers: dict) -> Response:
+    with profiling.phase("transform"):
+        payload = build_payload()
+    with profiling.phase("serialize"):
+        return ORJSONResponse(payload, headers=headers)
+
+def _profile_response(profile: CompanyProfile) -> dict:
+    response = profile._asdict()
+    del response["description"]
+    return response
+
+def _key_metrics_response(metrics: KeyMetrics) -> dict:
+    return metrics._asdict()
+
 @router.get("/stock/{symbol}")
-def get_stock(symbol: str):
+async def get_stock(symbol: str, request: Request):
     try:
         logger.info(f"Fetching stock data for {symbol}")
-        data = fmp_service.fetch_global_quote(symbol)
+        data = await fmp_service.fetch_global_quote(symbol)
 
         # Check for error messages first
-        if "Error Message" in data:
+        if fmp_service.is_error(data):
             logger.error(f"FMP service error for {symbol}: {data['Error Message']}")
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, 
                 detail=data['Error Message']
             )
 
-        # Check if we have the expected Global Quote structure
-        if "Global Quote" in data:
-            quote = data["Global Quote"]
+        # Check if we have the expected quote record
+        if isinstance(data, Quote):
             logger.info(f"Successfully processed stock data for {symbol}")
             
-            return {
-                "symbol": quote.get("01. symbol", symbol),
-                "price": float(quote.get("05. price", 0)),
-                "change": str(quote.get("09. change", "0")),
-                "change_percent": quote.get("10. change percent", "0%"),
-                "last_updated": quote.get("07. latest trading day", "Unknown"),
-                "open_price": float(quote.get("02. open", 0)),
-                "high": float(quote.get("03. high", 0)),
-                "low": float(quote.get("04. low", 0)),
-                "volume": int(quote.get("06. volume", 0)),
-                "previous_close": float(quote.get("08. previous close", 0))
-            }
+            return _conditional_response(request, [("FMP_QUOTE", symbol)], data.as_response)
         else:
             logger.error(f"Unexpected data structure for {symbol}: {list(data.keys()) if isinstance(data, dict) else type(data)}")
             raise HTTPException(
@@ -50,7 +93,7 @@ def get_stock(symbol: str):
     except HTTPException:
         # Re-raise HTTPExceptions (our custom errors)
         raise
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"Request exception for {symbol}: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -63,17 +106,83 @@ def get_stock(symbol: str):
             detail=f"An unhandled error occurred: {str(e)}"
         )
 
+def _parse_symbol_list(symbols: str) -> list[str]:
+    """Splits a comma-separated symbol list, upper-cased and de-duplicated in order."""
+    symbol_list = list(dict.fromkeys(part.strip().upper() for part in symbols.split(",") if part.strip()))
+    if not symbol_list:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Please provide at least one symbol."
+        )
+    if len(symbol_list) > MAX_BATCH_SYMBOLS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many symbols requested. The maximum is {MAX_BATCH_SYMBOLS}."
+        )
+    return symbol_list
+
+@router.get("/quotes")
+async def get_batch_quotes(symbols: str, request: Request):
+    """
+    Get quotes for a comma-separated list of symbols in one request
+    """
+    symbol_list = _parse_symbol_list(symbols)
+
+    try:
+        logger.info(f"Fetching batch quotes for {len(symbol_list)} symbols")
+        data = await fmp_service.fetch_batch_quotes(symbol_list)
+
+        def build_payload():
+            quotes = []
+            errors = {}
+            for symbol in symbol_list:
+                item = data[symbol]
+                if fmp_service.is_error(item):
+                    errors[symbol] = item["Error Message"]
+                else:
+                    quotes.append(item.as_response())
+            return {"quotes": quotes, "errors": errors}
+
+        logger.info(f"Successfully fetched batch quotes for {len(symbol_list)} symbols")
+        return _conditional_response(request, [("FMP_QUOTE", symbol) for symbol in symbol_list], build_payload)
+
+    except Exception as e:
+        logger.error(f"Unexpected error for batch quotes: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An unhandled error occurred in batch quotes: {str(e)}"
+        )
+
 @router.get("/price/{symbol}")
-def get_price_history(symbol: str, days: int = 30):
+async def get_price_history(
+    symbol: str,
+    request: Request,
+    days: int = 30,
+    start: str | None = None,
+    end: str | None = None,
+    interval: str = "1d"
+):
     """
-    Get daily price history
+    Get price history. Either the latest `days` daily bars, or every bar between
+    `start` and `end` (YYYY-MM-DD, inclusive) when either is given. `interval`
+    resamples the result to N-day ("5d"), weekly ("1w") or monthly ("1mo") bars.
     """
     try:
-        logger.info(f"Fetching price history for {symbol} ({days} days)")
-        data = fmp_service.fetch_daily_time_series(symbol)
+        interval = normalize_interval(interval)
+        start_date = np.datetime64(start, "D") if start else None
+        end_date = np.datetime64(end, "D") if end else None
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid price history query: {str(e)}"
+        )
+
+    try:
+        logger.info(f"Fetching price history for {symbol} ({days} days, {start} to {end}, {interval})")
+        data = await fmp_service.fetch_daily_time_series(symbol)
 
         # Check for error messages first
-        if "Error Message" in data:
+        if fmp_service.is_error(data):
             logger.error(f"FMP service error for historical data {symbol}: {data['Error Message']}")
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -82,44 +191,33 @@ def get_price_history(symbol: str, days: int = 30):
 
         # Check if we have the expected Time Series structure
         if "Time Series (Daily)" in data:
-            historical_data_list = data["Time Series (Daily)"]
-            logger.info(f"Processing {len(historical_data_list)} days of historical data for {symbol}")
-
-            prices = []
-            # Take only the requested number of days
-            for item_dict in historical_data_list[:days]:
-                if isinstance(item_dict, dict):
-                    # Check if all required fields are present
-                    required_fields = ["date", "close", "volume", "high", "low"]
-                    if all(field in item_dict for field in required_fields):
-                        try:
-                            prices.append({
-                                "date": item_dict["date"],
-                                "close": float(item_dict["close"]),
-                                "volume": int(item_dict["volume"]),
-                                "high": float(item_dict["high"]),
-                                "low": float(item_dict["low"])
-                            })
-                        except (ValueError, TypeError) as e:
-                            logger.warning(f"Error converting data types for {symbol} on {item_dict.get('date', 'unknown')}: {e}")
-                            continue
-                    else:
-                        logger.warning(f"Missing required fields in historical data for {symbol}: {item_dict}")
-                        continue
+            history = data["Time Series (Daily)"]
+            logger.info(f"Processing {len(history)} days of historical data for {symbol}")
+
+            def build_payload():
+                # Bars are validated at ingest and stored oldest to newest
+                if start_date is not None or end_date is not None:
+                    selected = history.between(start_date, end_date)
                 else:
-                    logger.warning(f"Invalid historical data item for {symbol}: {item_dict}")
-                    continue
+                    selected = history.tail(days)
 
-            # Reverse to get chronological order (oldest to newest)
-            prices.reverse()
+                if interval == "1d":
+                    prices = selected.to_records()
+                else:
+                    prices = selected.resample(interval).to_records(("date", "open", "close", "volume", "high", "low"))
 
-            logger.info(f"Successfully processed {len(prices)} days of price history for {symbol}")
-            return {
-                "symbol": symbol,
-                "days_requested": days,
-                "days_returned": len(prices),
-                "prices": prices
-            }
+                logger.info(f"Successfully processed {len(prices)} bars of price history for {symbol}")
+                return {
+                    "symbol": symbol,
+                    "days_requested": days,
+                    "days_returned": len(prices),
+                    "start": start,
+                    "end": end,
+                    "interval": interval,
+                    "prices": prices
+                }
+
+            return _conditional_response(request, [("FMP_HISTORICAL_DAILY", symbol)], build_payload)
         else:
             logger.error(f"Unexpected historical data structure for {symbol}: {list(data.keys()) if isinstance(data, dict) else type(data)}")
             raise HTTPException(
@@ -130,7 +228,7 @@ def get_price_history(symbol: str, days: int = 30):
     except HTTPException:
         # Re-raise HTTPExceptions (custom errors)
         raise
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"Request exception for historical data {symbol}: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -143,42 +241,106 @@ def get_price_history(symbol: str, days: int = 30):
             detail=f"An unhandled error occurred in price history: {str(e)}"
         )
 
+# ENDPOINT FOR TECHNICAL INDICATORS
+def _series_to_json(values: np.ndarray) -> list:
+    """Converts a float array to a list with NaN (warm-up bars) as null."""
+    series = values.astype(object)
+    series[np.isnan(values)] = None
+    return series.tolist()
+
+@router.get("/indicators/{symbol}")
+async def get_indicators(symbol: str, request: Request, indicators: str = "sma:20,ema:20,rsi:14", days: int = 90):
+    """
+    Get technical indicators computed server-side over the cached daily series.
+    `indicators` is a comma-separated list such as "sma:50,rsi:14,macd:12:26:9,bollinger:20:2".
+    """
+    try:
+        requested = [indicator_engine.parse_indicator(spec) for spec in indicators.split(",") if spec.strip()]
+    except indicator_engine.IndicatorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if not requested or len(requested) > MAX_INDICATORS_PER_REQUEST:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Please request between 1 and {MAX_INDICATORS_PER_REQUEST} indicators."
+        )
+
+    try:
+        logger.info(f"Computing indicators {indicators} for {symbol} ({days} days)")
+        data = await fmp_service.fetch_daily_time_series(symbol)
+
+        if fmp_service.is_error(data):
+            logger.error(f"FMP service error for indicators {symbol}: {data['Error Message']}")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=data['Error Message']
+            )
+
+        if "Time Series (Daily)" in data:
+            history = data["Time Series (Daily)"]
+            window = history.tail(days)
+
+            def build_payload():
+                results = {}
+                for name, params in requested:
+                    label = ":".join([name, *(str(value) for value in params.values())])
+                    outputs = indicator_engine.compute_indicator(symbol, history, name, params)
+                    results[label] = {
+                        key: _series_to_json(values[len(values) - len(window):])
+                        for key, values in outputs.items()
+                    }
+
+                logger.info(f"Successfully computed {len(results)} indicators for {symbol}")
+                return {
+                    "symbol": symbol,
+                    "days_requested": days,
+                    "days_returned": len(window),
+                    "dates": window.dates.astype(str).tolist(),
+                    "indicators": results
+                }
+
+            return _conditional_response(request, [("FMP_HISTORICAL_DAILY", symbol)], build_payload)
+        else:
+            logger.error(f"Unexpected historical data structure for indicators {symbol}: {list(data.keys()) if isinstance(data, dict) else type(data)}")
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Could not compute indicators for {symbol}. No daily time series found or unexpected structure."
+            )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error for indicators {symbol}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An unhandled error occurred in indicators: {str(e)}"
+        )
+
 # Endpoint for Company Profile (description removed)
 @router.get("/profile/{symbol}")
-def get_company_profile(symbol: str):
+async def get_company_profile(symbol: str, request: Request):
     """
     Get detailed company profile information
     """
     try:
         logger.info(f"Fetching company profile for {symbol}")
-        data = fmp_service.fetch_company_profile(symbol)
+        data = await fmp_service.fetch_company_profile(symbol)
 
         # Check for error messages first
-        if "Error Message" in data:
+        if fmp_service.is_error(data):
             logger.error(f"FMP service error for company profile {symbol}: {data['Error Message']}")
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=data['Error Message']
             )
 
-        # Check if we have the expected Company Profile structure
-        if "Company Profile" in data:
-            profile = data["Company Profile"]
+        # Check if we have the expected company profile record
+        if isinstance(data, CompanyProfile):
             logger.info(f"Successfully processed company profile for {symbol}")
             
-            return {
-                "symbol": profile.get("Symbol", symbol),
-                "company_name": profile.get("Company Name", "N/A"),
-                "exchange": profile.get("Exchange", "N/A"),
-                "industry": profile.get("Industry", "N/A"),
-                "sector": profile.get("Sector", "N/A"),
-                "ceo": profile.get("CEO", "N/A"),
-                "website": profile.get("Website", "N/A"),
-                "full_time_employees": profile.get("Full Time Employees", "N/A"),
-                "country": profile.get("Country", "N/A"),
-                "ipo_date": profile.get("IPODate", "N/A"),
-                "market_cap": profile.get("Market Cap", "N/A")
-            }
+            return _conditional_response(request, [("FMP_COMPANY_PROFILE", symbol)], lambda: _profile_response(data))
         else:
             logger.error(f"Unexpected company profile data structure for {symbol}: {list(data.keys()) if isinstance(data, dict) else type(data)}")
             raise HTTPException(
@@ -188,7 +350,7 @@ def get_company_profile(symbol: str):
 
     except HTTPException:
         raise
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"Request exception for company profile {symbol}: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -203,37 +365,25 @@ def get_company_profile(symbol: str):
 
 # ENDPOINT FOR KEY METRICS
 @router.get("/key-metrics/{symbol}")
-def get_key_metrics(symbol: str):
+async def get_key_metrics(symbol: str, request: Request):
     """
     Get key financial metrics and ratios for a company.
     """
     try:
         logger.info(f"Fetching key metrics for {symbol}")
-        data = fmp_service.fetch_key_metrics(symbol)
+        data = await fmp_service.fetch_key_metrics(symbol)
 
-        if "Error Message" in data:
+        if fmp_service.is_error(data):
             logger.error(f"FMP service error for key metrics {symbol}: {data['Error Message']}")
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=data['Error Message']
             )
 
-        if "Key Metrics" in data:
-            metrics = data["Key Metrics"]
+        if isinstance(data, KeyMetrics):
             logger.info(f"Successfully processed key metrics for {symbol}")
             
-            # Format numeric values (e.g., to float or for display)
-            return {
-                "symbol": metrics.get("Symbol", symbol),
-                "date": metrics.get("Date", "N/A"),
-                "revenue_per_share": metrics.get("Revenue Per Share", "N/A"),
-                "net_income_per_share": metrics.get("Net Income Per Share", "N/A"),
-                "pe_ratio": metrics.get("PE Ratio", "N/A"),
-                "current_ratio": metrics.get("Current Ratio", "N/A"),
-                "debt_to_equity": metrics.get("Debt to Equity", "N/A"),
-                "dividend_yield": metrics.get("Dividend Yield", "N/A"),
-                "eps": metrics.get("EPS", "N/A")
-            }
+            return _conditional_response(request, [("FMP_KEY_METRICS", symbol)], lambda: _key_metrics_response(data))
         else:
             logger.error(f"Unexpected key metrics data structure for {symbol}: {list(data.keys()) if isinstance(data, dict) else type(data)}")
             raise HTTPException(
@@ -243,7 +393,7 @@ def get_key_metrics(symbol: str):
 
     except HTTPException:
         raise
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"Request exception for key metrics {symbol}: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -254,4 +404,156 @@ def get_key_metrics(symbol: str):
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An unhandled error occurred in key metrics: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+# ENDPOINT FOR SYMBOL SNAPSHOT
+async def _fetch_snapshot_part(fetch, symbol: str) -> dict:
+    try:
+        return await asyncio.wait_for(fetch(symbol), timeout=SNAPSHOT_PART_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        return {"Error Message": f"Timed out fetching data for {symbol}"}
+
+@router.get("/snapshot/{symbol}")
+async def get_symbol_snapshot(symbol: str, request: Request):
+    """
+    Get quote, company profile and key metrics in one call. The three FMP fetches
+    run concurrently; parts that fail or time out are null and listed in "errors".
+    """
+    logger.info(f"Fetching snapshot for {symbol}")
+    parts = [
+        ("quote", fmp_service.fetch_global_quote, Quote, Quote.as_response),
+        ("profile", fmp_service.fetch_company_profile, CompanyProfile, _profile_response),
+        ("key_metrics", fmp_service.fetch_key_metrics, KeyMetrics, _key_metrics_response),
+    ]
+    results = await asyncio.gather(
+        *[_fetch_snapshot_part(fetch, symbol) for _, fetch, _, _ in parts],
+        return_exceptions=True
+    )
+
+    snapshot = {"symbol": symbol}
+    errors = {}
+    for (name, _, record_type, build_response), data in zip(parts, results):
+        snapshot[name] = None
+        if isinstance(data, Exception):
+            logger.error(f"Unexpected error for {name} snapshot part of {symbol}: {str(data)}")
+            errors[name] = f"An unhandled error occurred: {str(data)}"
+        elif fmp_service.is_error(data):
+            logger.error(f"FMP service error for {name} snapshot part of {symbol}: {data['Error Message']}")
+            errors[name] = data["Error Message"]
+        elif isinstance(data, record_type):
+            snapshot[name] = build_response(data)
+        else:
+            errors[name] = "Unexpected FMP API response structure."
+
+    if len(errors) == len(parts):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=errors["quote"]
+        )
+
+    snapshot["errors"] = errors
+    logger.info(f"Successfully processed snapshot for {symbol} ({len(parts) - len(errors)}/{len(parts)} parts)")
+    cache_keys = [("FMP_QUOTE", symbol), ("FMP_COMPANY_PROFILE", symbol), ("FMP_KEY_METRICS", symbol)]
+    return _conditional_response(request, cache_keys, lambda: snapshot)
+
+
+# ENDPOINT FOR BULK HISTORY EXPORT
+@router.get("/export/history")
+async def export_price_history(
+    symbols: str,
+    start: str | None = None,
+    end: str | None = None,
+    format: str = "arrow"
+):
+    """
+    Stream daily bars for a comma-separated list of symbols as an Arrow IPC stream ("arrow")
+    or a Parquet file ("parquet"), built from the same cached history as /price/{symbol}.
+    Symbols that could not be loaded are listed in the X-Missing-Symbols header.
+    """
+    if not history_export.is_available():
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Bulk export requires pyarrow, which is not installed on this server."
+        )
+    if format not in history_export.EXPORT_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported export format '{format}'. Use {' or '.join(history_export.EXPORT_MEDIA_TYPES)}."
+        )
+    symbol_list = _parse_symbol_list(symbols)
+    try:
+        start_date = np.datetime64(start, "D") if start else None
+        end_date = np.datetime64(end, "D") if end else None
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid export query: {str(e)}"
+        )
+
+    logger.info(f"Exporting {format} price history for {len(symbol_list)} symbols ({start} to {end})")
+    histories, errors = await history_export.load_histories(symbol_list)
+    if not histories:
+        logger.error(f"Bulk export found no history for any of {len(symbol_list)} symbols")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=errors
+        )
+
+    extension = "arrows" if format == "arrow" else "parquet"
+    return StreamingResponse(
+        history_export.stream_histories(histories, format, start_date, end_date),
+        media_type=history_export.EXPORT_MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="price_history.{extension}"',
+            "X-Missing-Symbols": ",".join(errors),
+        }
+    )
+
+# ENDPOINT FOR LIVE QUOTE STREAMING
+@router.get("/stream/quotes")
+async def stream_quotes(symbols: str):
+    """
+    Stream quote updates for a comma-separated list of symbols as Server-Sent Events.
+    Every symbol has one shared upstream poller, and an event is sent only when its price changes.
+    """
+    symbol_list = _parse_symbol_list(symbols)
+
+    async def event_stream():
+        queue = None
+        try:
+            queue = quote_hub.subscribe(symbol_list)
+            logger.info(f"Quote stream opened for {len(symbol_list)} symbols")
+            while True:
+                try:
+                    update = await asyncio.wait_for(queue.get(), timeout=QUOTE_STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+
+                if "error" in update:
+                    yield f"event: quote_error\ndata: {json.dumps(update)}\n\n"
+                else:
+                    payload = update["quote"].as_response()
+                    yield f"event: quote\ndata: {json.dumps(payload)}\n\n"
+        finally:
+            if queue is not None:
+                quote_hub.unsubscribe(queue, symbol_list)
+                logger.info(f"Quote stream closed for {len(symbol_list)} symbols")
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# ENDPOINT FOR SERVICE STATS
+@router.get("/service-stats")
+async def get_service_stats():
+    """
+    Cache and upstream call coalescing counters for the FMP service layer.
+    """
+    return {
+        **fmp_service.get_service_stats(),
+        "indicator_memo": indicator_engine.get_memo_stats(),
+        "quote_stream": quote_hub.stats(),
+    }
@@ -1,21 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.database import get_session
+from app.database import get_async_session
 from app.crud import crud_users
 
 from app.schemas.user_schemas import UserCreate, UserLogin, UserPublic
 
-from app.core.security import verify_password, get_password_hash
+from app.core.password_hasher import password_hasher
 
 router = APIRouter()
 
 # User Registration Endpoint
 
 @router.post("/register", response_model=UserPublic, status_code=status.HTTP_201_CREATED)
-def register_user(
+async def register_user(
     user_create: UserCreate, 
-    session: Session = Depends(get_session) 
+    session: AsyncSession = Depends(get_async_session) 
 ):
     """
     Register a new user.
@@ -23,34 +23,40 @@ def register_user(
     - Hashes password and stores user in DB.
     """
     # Check if a user with this username already exists
-    db_user = crud_users.get_user_by_username(session, username=user_create.username)
+    db_user = await crud_users.get_user_by_username_async(session, username=user_create.username)
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Username already registered"
         )
 
-    # Create the user in the database
-    new_user = crud_users.create_user(session, user_create=user_create)
+    # Hash the password in the bcrypt process pool (deliberately slow), then create the user
+    hashed_password = await password_hasher.hash(user_create.password)
+    new_user = await crud_users.create_user_async(session, user_create=user_create, hashed_password=hashed_password)
 
     return new_user 
 
 # Endpoint for User Login
 @router.post("/login")
-def login_for_access_token(
+async def login_for_access_token(
     user_login: UserLogin, 
-    session: Session = Depends(get_session) 
+    session: AsyncSession = Depends(get_async_session) 
 ):
     """
     Authenticate a user and return a placeholder access token.
+    - Re-hashes the stored password if it was hashed with a different bcrypt cost.
     """
-    user = crud_users.get_user_by_username(session, username=user_login.username)
-    if not user or not verify_password(user_login.password, user.hashed_password):
+    user = await crud_users.get_user_by_username_async(session, username=user_login.username)
+    if user:
+        is_valid, new_hash = await password_hasher.verify_and_update(user_login.password, user.hashed_password)
+    if not user or not is_valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"}, 
         )
+    if new_hash:
+        await crud_users.update_password_hash_async(session, user, new_hash)
 
     # For MVP, return a simple success message and a placeholder token
     # In a real app, this would be a securely generated JWT
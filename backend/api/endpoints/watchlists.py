@@ -1,71 +1,143 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session
-from typing import List
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import List, Optional
 
-from app.database import get_session
+from app.database import get_async_session
 from app.crud import crud_watchlists
-from app.schemas.user_schemas import WatchlistItemCreate, WatchlistItemPublic 
+from app.schemas.user_schemas import (
+    WatchlistBulkAddResult,
+    WatchlistBulkCreate,
+    WatchlistBulkRemoveResult,
+    WatchlistItemCreate,
+    WatchlistItemPublic,
+    WatchlistItemWithQuote,
+)
 from app.core.security import get_current_user_id 
+from services import fmp_service
+from services.watchlist_cache import watchlist_cache
 
 router = APIRouter()
 
 # --- Endpoint to Get User's Watchlist ---
-@router.get("/", response_model=List[WatchlistItemPublic])
-def get_user_watchlist(
+@router.get("/", response_model=List[WatchlistItemWithQuote], response_model_exclude_none=True)
+async def get_user_watchlist(
+    include: Optional[str] = None,
     current_user_id: int = Depends(get_current_user_id), 
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
     Retrieve all watchlist items for the authenticated user.
+    - Served from the per-user watchlist cache when it is current; the database is only read on a miss.
+    - `include=quote` attaches each item's quote, fetched in one batched, cache-aware lookup.
     """
-    watchlist = crud_watchlists.get_watchlist_by_user(session, user_id=current_user_id)
-    return watchlist
+    includes = {part.strip() for part in include.split(",") if part.strip()} if include else set()
+    if includes - {"quote"}:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported include '{','.join(sorted(includes - {'quote'}))}'. Supported: quote."
+        )
+
+    watchlist = watchlist_cache.get(current_user_id)
+    if watchlist is None:
+        version = watchlist_cache.version(current_user_id)
+        watchlist = await crud_watchlists.get_watchlist_by_user_async(session, user_id=current_user_id)
+        watchlist_cache.set(current_user_id, watchlist, version)
+    if "quote" not in includes:
+        return watchlist
+
+    quotes = await fmp_service.fetch_batch_quotes(list(dict.fromkeys(item.symbol.upper() for item in watchlist)))
+    enriched = []
+    for item in watchlist:
+        quote = quotes[item.symbol.upper()]
+        if fmp_service.is_error(quote):
+            attached = {"quote_error": quote["Error Message"]}
+        else:
+            attached = {"quote": quote.as_response()}
+        enriched.append(WatchlistItemWithQuote(id=item.id, symbol=item.symbol, user_id=item.user_id, **attached))
+    return enriched
 
 # --- Endpoint to Add Stock to Watchlist ---
 @router.post("/", response_model=WatchlistItemPublic, status_code=status.HTTP_201_CREATED)
-def add_stock_to_watchlist_endpoint(
+async def add_stock_to_watchlist_endpoint(
     watchlist_item_create: WatchlistItemCreate,
     current_user_id: int = Depends(get_current_user_id), 
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
     Add a stock symbol to the authenticated user's watchlist.
-    - Ensures the stock isn't already on the watchlist.
+    - Ensures the stock isn't already on the watchlist (one INSERT ... ON CONFLICT statement).
     """
-    # Check if item already exists for this user
-    existing_item = crud_watchlists.get_watchlist_item_by_symbol_and_user(
-        session, symbol=watchlist_item_create.symbol, user_id=current_user_id
+    new_item = await crud_watchlists.add_stock_to_watchlist_async(
+        session, watchlist_item_create=watchlist_item_create, user_id=current_user_id
     )
-    if existing_item:
+    if new_item is None:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail=f"Stock '{watchlist_item_create.symbol}' already in watchlist."
         )
-
-    # Add stock to the watchlist
-    new_item = crud_watchlists.add_stock_to_watchlist(
-        session, watchlist_item_create=watchlist_item_create, user_id=current_user_id
-    )
+    watchlist_cache.add_items(current_user_id, [new_item])
     return new_item
 
+# --- Endpoint to Add Several Stocks to Watchlist ---
+@router.post("/bulk", response_model=WatchlistBulkAddResult, status_code=status.HTTP_201_CREATED)
+async def add_stocks_to_watchlist_endpoint(
+    watchlist_bulk_create: WatchlistBulkCreate,
+    current_user_id: int = Depends(get_current_user_id), 
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Add many stock symbols to the authenticated user's watchlist in one transaction.
+    - Symbols already on the watchlist are skipped and listed in "skipped".
+    """
+    symbols = _validated_symbols(watchlist_bulk_create.symbols)
+    added = await crud_watchlists.add_stocks_to_watchlist_async(session, symbols=symbols, user_id=current_user_id)
+    if added:
+        watchlist_cache.add_items(current_user_id, added)
+    added_symbols = {item.symbol for item in added}
+    return {"added": added, "skipped": [symbol for symbol in symbols if symbol not in added_symbols]}
+
+# --- Endpoint to Remove Several Stocks from Watchlist ---
+@router.delete("/", response_model=WatchlistBulkRemoveResult)
+async def remove_stocks_from_watchlist_endpoint(
+    symbols: str,
+    current_user_id: int = Depends(get_current_user_id), 
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Remove a comma-separated list of stock symbols from the authenticated user's watchlist in one statement.
+    """
+    symbol_list = _validated_symbols(symbols.split(","))
+    removed = await crud_watchlists.remove_stocks_from_watchlist_async(session, symbols=symbol_list, user_id=current_user_id)
+    if removed:
+        watchlist_cache.remove_symbols(current_user_id, removed)
+    return {"removed": removed, "not_found": [symbol for symbol in symbol_list if symbol not in removed]}
+
+def _validated_symbols(symbols: List[str]) -> List[str]:
+    """Strips and de-duplicates symbols in order, applying the same rules as WatchlistItemCreate."""
+    symbol_list = list(dict.fromkeys(symbol.strip() for symbol in symbols if symbol.strip()))
+    invalid = [symbol for symbol in symbol_list if len(symbol) > 10]
+    if not symbol_list or invalid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid symbols: {', '.join(invalid)}" if invalid else "Please provide at least one symbol."
+        )
+    return symbol_list
+
 # --- Endpoint to Remove Stock from Watchlist ---
 @router.delete("/{symbol}", status_code=status.HTTP_204_NO_CONTENT) # 204 No Content for successful deletion
-def remove_stock_from_watchlist_endpoint(
+async def remove_stock_from_watchlist_endpoint(
     symbol: str, 
     current_user_id: int = Depends(get_current_user_id), 
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
     Remove a stock symbol from the authenticated user's watchlist.
     """
-    item_to_delete = crud_watchlists.get_watchlist_item_by_symbol_and_user(
-        session, symbol=symbol, user_id=current_user_id
-    )
-    if not item_to_delete:
+    removed = await crud_watchlists.remove_stocks_from_watchlist_async(session, symbols=[symbol], user_id=current_user_id)
+    if not removed:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Stock '{symbol}' not found in watchlist or does not belong to user."
         )
-
-    crud_watchlists.remove_stock_from_watchlist(session, watchlist_item=item_to_delete)
+    watchlist_cache.remove_symbols(current_user_id, removed)
     return 
@@ -1,28 +1,33 @@
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.models import User
 from app.schemas.user_schemas import UserCreate
-from app.core.security import get_password_hash
 
-def get_user_by_username(session: Session, username: str) -> User | None:
-    user = session.exec(select(User).where(User.username == username)).first()
-    return user
+async def get_user_by_username_async(session: AsyncSession, username: str) -> User | None:
+    result = await session.exec(select(User).where(User.username == username))
+    return result.first()
 
-def create_user(session: Session, user_create: UserCreate) -> User:
+async def create_user_async(session: AsyncSession, user_create: UserCreate, hashed_password: str) -> User:
     """
-    Creates a new user in the database after hashing the password.
+    Creates a new user in the database. The password is hashed by the caller,
+    off the event loop.
     """
-    # Hash the plain password before storing it
-    hashed_password = get_password_hash(user_create.password)
-
-    # Create a new User model instance
     user_to_db = User(
         username=user_create.username,
         hashed_password=hashed_password
     )
 
-    # Add the new user to the session and commit to the database
     session.add(user_to_db)
-    session.commit()
-    session.refresh(user_to_db) # Refresh to get the generated ID from the DB
+    await session.commit()
+    await session.refresh(user_to_db)
 
     return user_to_db
+
+async def update_password_hash_async(session: AsyncSession, user: User, hashed_password: str) -> User:
+    """
+    Replaces a user's stored hash, e.g. after the bcrypt cost has changed.
+    """
+    user.hashed_password = hashed_password
+    session.add(user)
+    await session.commit()
+    return user
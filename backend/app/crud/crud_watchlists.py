@@ -1,58 +1,90 @@
-from sqlmodel import Session, select
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.models import WatchlistItem, User 
 from app.schemas.user_schemas import WatchlistItemCreate 
 
-def get_watchlist_item_by_symbol_and_user(
-    session: Session,
-    symbol: str,
-    user_id: int
-) -> WatchlistItem | None:
+async def get_watchlist_by_user_async(session: AsyncSession, user_id: int) -> list[WatchlistItem]:
     """
-    Retrieves a specific watchlist item by symbol and user ID.
+    Retrieves all watchlist items for a given user.
     """
-    item = session.exec(
+    result = await session.exec(
         select(WatchlistItem)
-        .where(WatchlistItem.symbol == symbol)
         .where(WatchlistItem.user_id == user_id)
-    ).first()
-    return item
+    )
+    return result.all()
 
-def get_watchlist_by_user(session: Session, user_id: int) -> list[WatchlistItem]:
+async def get_all_watchlist_symbols_async(session: AsyncSession) -> list[str]:
     """
-    Retrieves all watchlist items for a given user.
+    Retrieves every distinct symbol on any user's watchlist.
     """
-    items = session.exec(
-        select(WatchlistItem)
-        .where(WatchlistItem.user_id == user_id)
-    ).all()
-    return items
+    result = await session.exec(
+        select(WatchlistItem.symbol).distinct()
+    )
+    return result.all()
 
-def add_stock_to_watchlist(
-    session: Session,
+def _insert_ignoring_duplicates(session: AsyncSession, rows: list[dict]):
+    """
+    INSERT ... ON CONFLICT (user_id, symbol) DO NOTHING RETURNING the inserted rows,
+    so duplicates are detected by the unique index in the same statement.
+    """
+    insert = sqlite_insert if session.bind.dialect.name == "sqlite" else postgresql_insert
+    return (
+        insert(WatchlistItem)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=["user_id", "symbol"])
+        .returning(WatchlistItem)
+    )
+
+async def add_stock_to_watchlist_async(
+    session: AsyncSession,
     watchlist_item_create: WatchlistItemCreate,
     user_id: int
-) -> WatchlistItem:
+) -> WatchlistItem | None:
     """
-    Adds a new stock symbol to a user's watchlist.
+    Adds a new stock symbol to a user's watchlist in a single statement.
+    Returns None if the symbol is already on the watchlist.
     """
-    watchlist_item_to_db = WatchlistItem(
-        symbol=watchlist_item_create.symbol,
-        user_id=user_id
+    result = await session.execute(
+        _insert_ignoring_duplicates(session, [{"symbol": watchlist_item_create.symbol, "user_id": user_id}])
     )
+    item = result.scalars().first()
+    await session.commit()
+    return item
 
-    session.add(watchlist_item_to_db)
-    session.commit()
-    session.refresh(watchlist_item_to_db) # Refresh to get the generated ID from the DB
-
-    return watchlist_item_to_db
+async def add_stocks_to_watchlist_async(
+    session: AsyncSession,
+    symbols: list[str],
+    user_id: int
+) -> list[WatchlistItem]:
+    """
+    Adds many symbols in one statement and one transaction.
+    Returns only the items that were actually inserted.
+    """
+    result = await session.execute(
+        _insert_ignoring_duplicates(session, [{"symbol": symbol, "user_id": user_id} for symbol in symbols])
+    )
+    items = result.scalars().all()
+    await session.commit()
+    return items
 
-def remove_stock_from_watchlist(
-    session: Session,
-    watchlist_item: WatchlistItem
-):
+async def remove_stocks_from_watchlist_async(
+    session: AsyncSession,
+    symbols: list[str],
+    user_id: int
+) -> list[str]:
     """
-    Removes a stock symbol from a user's watchlist.
+    Removes symbols from a user's watchlist in one statement.
+    Returns the symbols that were actually removed.
     """
-    session.delete(watchlist_item)
-    session.commit()
-    return {"message": "Item removed successfully"} 
+    result = await session.execute(
+        delete(WatchlistItem)
+        .where(WatchlistItem.user_id == user_id)
+        .where(WatchlistItem.symbol.in_(symbols))
+        .returning(WatchlistItem.symbol)
+    )
+    removed = result.scalars().all()
+    await session.commit()
+    return removed
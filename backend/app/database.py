@@ -1,4 +1,7 @@
-from sqlmodel import Session, create_engine, SQLModel
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import create_engine, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
 from dotenv import load_dotenv
 import os
 
@@ -8,17 +11,91 @@ load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-# Create SQLAlchemy Engine
+# --- CONNECTION POOL SETUP ---
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"  # Logs every SQL statement; for local debugging only
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+DB_POOL_RECYCLE_SECONDS = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))  # 30 minutes
+# Prepared statements cached per asyncpg connection; set to 0 behind a transaction-mode pgbouncer
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
 
-engine = create_engine(DATABASE_URL, echo=True, pool_pre_ping=True) # Remove echo=True in production
+def _async_database_url(url: str) -> str:
+    """Swaps the driver in DATABASE_URL for its asyncio counterpart."""
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    if url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + url[len("sqlite://"):]
+    return url
+
+def _pool_options(url: str) -> dict:
+    if url.startswith("sqlite"):
+        return {}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": DB_POOL_RECYCLE_SECONDS,
+    }
+
+# Create SQLAlchemy Engines
+# The sync engine creates the tables at startup; request handlers use the async one
+
+engine = create_engine(DATABASE_URL, echo=DB_ECHO, pool_pre_ping=True, **_pool_options(DATABASE_URL))
+
+ASYNC_DATABASE_URL = _async_database_url(DATABASE_URL)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    echo=DB_ECHO,
+    pool_pre_ping=True,
+    connect_args=(
+        {"statement_cache_size": DB_STATEMENT_CACHE_SIZE, "prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE}
+        if ASYNC_DATABASE_URL.startswith("postgresql+asyncpg")
+        else {}
+    ),
+    **_pool_options(ASYNC_DATABASE_URL),
+)
+async_session_maker = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
 
 # Create database tabels
 
 def create_db_and_tables():
     SQLModel.metadata.create_all(engine)
+    _ensure_watchlist_unique_index()
+
+WATCHLIST_UNIQUE_INDEX = "ix_watchlistitem_user_id_symbol"
+
+def _ensure_watchlist_unique_index():
+    """
+    create_all() doesn't add indexes to tables that already exist, so older databases
+    get the unique (user_id, symbol) index here. Duplicate rows have to be removed first
+    with the one-off app.migrations.dedupe_watchlist script; startup never deletes data.
+    """
+    existing = {index["name"] for index in inspect(engine).get_indexes("watchlistitem")}
+    if WATCHLIST_UNIQUE_INDEX in existing:
+        return
+    with engine.begin() as connection:
+        duplicates = count_duplicate_watchlist_items(connection)
+        if duplicates:
+            raise RuntimeError(
+                f"The watchlistitem table has {duplicates} duplicate (user_id, symbol) rows, so the unique "
+                f"index {WATCHLIST_UNIQUE_INDEX} can't be created. Run `python -m app.migrations.dedupe_watchlist` once, then restart."
+            )
+        # IF NOT EXISTS: another worker starting at the same time may have just created it
+        connection.execute(text(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS {WATCHLIST_UNIQUE_INDEX} ON watchlistitem (user_id, symbol)"
+        ))
+
+def count_duplicate_watchlist_items(connection) -> int:
+    """Rows that repeat an earlier row's (user_id, symbol)."""
+    return connection.execute(text(
+        "SELECT COUNT(*) FROM watchlistitem WHERE id NOT IN "
+        "(SELECT MIN(id) FROM watchlistitem GROUP BY user_id, symbol)"
+    )).scalar_one()
 
 # Database session dependency
 
-def get_session():
-    with Session(engine) as session:
-        yield session
\ No newline at end of file
+async def get_async_session():
+    async with async_session_maker() as session:
+        yield session
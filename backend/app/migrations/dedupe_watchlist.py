@@ -0,0 +1,35 @@
+"""
+One-off migration for databases created before watchlist items were unique per user:
+deletes repeated (user_id, symbol) rows, keeping the oldest, and adds the unique index
+the app expects. Stop the app first; it refuses to start while duplicates remain.
+
+    python -m app.migrations.dedupe_watchlist --dry-run
+    python -m app.migrations.dedupe_watchlist
+"""
+import argparse
+
+from sqlalchemy import text
+
+from app.database import WATCHLIST_UNIQUE_INDEX, count_duplicate_watchlist_items, engine
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Only report how many rows would be deleted")
+    args = parser.parse_args()
+
+    with engine.begin() as connection:
+        duplicates = count_duplicate_watchlist_items(connection)
+        if args.dry_run:
+            print(f"{duplicates} duplicate watchlist rows would be deleted")
+            return
+        connection.execute(text(
+            "DELETE FROM watchlistitem WHERE id NOT IN "
+            "(SELECT MIN(id) FROM watchlistitem GROUP BY user_id, symbol)"
+        ))
+        connection.execute(text(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS {WATCHLIST_UNIQUE_INDEX} ON watchlistitem (user_id, symbol)"
+        ))
+    print(f"Deleted {duplicates} duplicate watchlist rows and ensured index {WATCHLIST_UNIQUE_INDEX}")
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,11 @@
 from typing import List, Optional
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship, SQLModel
 
 class WatchlistItem(SQLModel, table=True):
+    # One row per (user, symbol); inserts rely on it for ON CONFLICT duplicate detection
+    __table_args__ = (Index("ix_watchlistitem_user_id_symbol", "user_id", "symbol", unique=True),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     symbol: str = Field(index=True)
 
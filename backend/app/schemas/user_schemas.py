@@ -31,5 +31,37 @@ class WatchlistItemPublic(BaseModel):
 
     class Config:
         from_attributes = True # Allows Pydantic to read from ORM models
+# Schema for adding several symbols at once
+class WatchlistBulkCreate(BaseModel):
+    symbols: List[str] = Field(..., min_length=1, max_length=200)
+
+# Schema for the result of a bulk add
+class WatchlistBulkAddResult(BaseModel):
+    added: List[WatchlistItemPublic]
+    skipped: List[str] # Already on the watchlist
+
+# Schema for the result of a bulk remove
+class WatchlistBulkRemoveResult(BaseModel):
+    removed: List[str]
+    not_found: List[str]
+
+# Schema for a stock quote attached to a watchlist item
+class StockQuotePublic(BaseModel):
+    symbol: str
+    price: float
+    change: str
+    change_percent: str
+    last_updated: str
+    open_price: float
+    high: float
+    low: float
+    volume: int
+    previous_close: float
+
+# Schema for a WatchlistItem with its quote (GET /watchlists/?include=quote)
+class WatchlistItemWithQuote(WatchlistItemPublic):
+    quote: Optional[StockQuotePublic] = None
+    quote_error: Optional[str] = None
+
 class UserWithWatchlist(UserPublic):
     watchlist_items: List[WatchlistItemPublic] = []
@@ -0,0 +1,138 @@
+"""
+Local stand-in for the FMP API, serving fixtures with configurable latency and rate limiting.
+
+    python -m benchmarks.fake_fmp --port 8765 --latency-ms 80 --jitter-ms 20 --rate-limit-per-minute 300
+
+Point the app at it with FMP_BASE_URL=http://127.0.0.1:8765/api/v3 and any FMP_API_KEY.
+Settings can be changed while it runs with POST /_control (same names as the flags,
+underscored), and GET /_stats reports calls per dataset and how many were throttled.
+"""
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from benchmarks.fixtures import FixtureStore
+
+# FMP answers a spent plan with this body, sometimes with HTTP 200
+RATE_LIMIT_BODY = {"Error Message": "Limit Reach . Please upgrade your plan or visit our documentation for more details"}
+
+class FakeFMPSettings:
+    def __init__(self, latency_ms: float = 0, jitter_ms: float = 0, rate_limit_per_minute: int = 0,
+                 rate_limit_mode: str = "429", error_rate: float = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_limit_per_minute = rate_limit_per_minute  # 0 disables the limit; a negative value throttles everything
+        self.rate_limit_mode = rate_limit_mode  # "429" or "body" (HTTP 200 with FMP's limit message)
+        self.error_rate = error_rate  # Fraction of calls answered with a 500
+
+def create_app(settings: FakeFMPSettings, fixtures: FixtureStore) -> FastAPI:
+    app = FastAPI()
+    calls = Counter()
+    window = {"started_at": time.monotonic(), "count": 0}
+
+    def throttle_response() -> JSONResponse | None:
+        limit = settings.rate_limit_per_minute
+        if limit == 0:
+            return None
+        now = time.monotonic()
+        if now - window["started_at"] >= 60:
+            window["started_at"] = now
+            window["count"] = 0
+        window["count"] += 1
+        if limit > 0 and window["count"] <= limit:
+            return None
+        calls["throttled"] += 1
+        if settings.rate_limit_mode == "body":
+            return JSONResponse(RATE_LIMIT_BODY)
+        retry_after = max(1, int(60 - (now - window["started_at"])))
+        return JSONResponse(RATE_LIMIT_BODY, status_code=429, headers={"Retry-After": str(retry_after)})
+
+    async def respond(dataset: str, build):
+        calls[dataset] += 1
+        delay_ms = settings.latency_ms + random.uniform(-settings.jitter_ms, settings.jitter_ms)
+        if delay_ms > 0:
+            await asyncio.sleep(delay_ms / 1000)
+        throttled = throttle_response()
+        if throttled is not None:
+            return throttled
+        if settings.error_rate and random.random() < settings.error_rate:
+            calls["errors"] += 1
+            return JSONResponse({"Error Message": "Internal error"}, status_code=500)
+        return JSONResponse(build())
+
+    @app.get("/api/v3/quote/{symbols}")
+    async def quote(symbols: str):
+        return await respond("quote", lambda: [
+            item for symbol in symbols.split(",") for item in fixtures.get("quote", symbol)
+        ])
+
+    @app.get("/api/v3/historical-price-full/{symbol}")
+    async def historical_price_full(symbol: str, request: Request):
+        since = request.query_params.get("from")
+
+        def build():
+            data = fixtures.get("historical-price-full", symbol)
+            if since and data.get("historical"):
+                return {**data, "historical": [bar for bar in data["historical"] if bar["date"] >= since]}
+            return data
+
+        return await respond("historical-price-full", build)
+
+    @app.get("/api/v3/profile/{symbol}")
+    async def profile(symbol: str):
+        return await respond("profile", lambda: fixtures.get("profile", symbol))
+
+    @app.get("/api/v3/key-metrics/{symbol}")
+    async def key_metrics(symbol: str):
+        return await respond("key-metrics", lambda: fixtures.get("key-metrics", symbol))
+
+    @app.get("/_stats")
+    async def stats():
+        return dict(calls)
+
+    @app.post("/_control")
+    async def control(changes: dict):
+        for name, value in changes.items():
+            if not hasattr(settings, name):
+                return JSONResponse({"detail": f"Unknown setting '{name}'"}, status_code=400)
+            setattr(settings, name, value)
+        window["started_at"] = time.monotonic()
+        window["count"] = 0
+        return vars(settings)
+
+    @app.post("/_reset")
+    async def reset():
+        calls.clear()
+        return {}
+
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--rate-limit-per-minute", type=int, default=0)
+    parser.add_argument("--rate-limit-mode", choices=["429", "body"], default="429")
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--fixtures", default=None, help="Directory of recorded fixtures (see benchmarks.fixtures)")
+    args = parser.parse_args()
+
+    settings = FakeFMPSettings(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        rate_limit_per_minute=args.rate_limit_per_minute,
+        rate_limit_mode=args.rate_limit_mode,
+        error_rate=args.error_rate,
+    )
+    uvicorn.run(create_app(settings, FixtureStore(args.fixtures)), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Response fixtures for the stand-in FMP server.
+
+By default every symbol gets deterministic generated data shaped like FMP's responses.
+Real responses can be recorded once (this needs FMP_API_KEY) and are then served instead:
+
+    python -m benchmarks.fixtures record --symbols AAPL,MSFT,NVDA --out benchmarks/recorded
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import zlib
+
+import httpx
+
+DATASETS = ("quote", "historical-price-full", "profile", "key-metrics")
+DEFAULT_SYMBOLS = ["AAPL", "MSFT", "NVDA", "AMZN", "GOOGL", "META", "TSLA", "JPM", "V", "XOM"]
+HISTORY_DAYS = 5 * 365
+# Symbols with this prefix answer with FMP's empty result, to exercise the not-found paths
+MISSING_SYMBOL_PREFIX = "ZZ"
+
+def _rng(symbol: str, dataset: str) -> random.Random:
+    return random.Random(zlib.crc32(f"{symbol}:{dataset}".encode()))
+
+def _history_bars(symbol: str) -> list[dict]:
+    rng = _rng(symbol, "historical-price-full")
+    close = rng.uniform(20, 500)
+    end = datetime.date.today() - datetime.timedelta(days=1)
+    bars = []
+    for offset in range(HISTORY_DAYS, -1, -1):
+        day = end - datetime.timedelta(days=offset)
+        if day.weekday() >= 5:
+            continue
+        open_price = close * (1 + rng.gauss(0, 0.005))
+        close = max(1.0, open_price * (1 + rng.gauss(0.0003, 0.018)))
+        bars.append({
+            "date": day.isoformat(),
+            "open": round(open_price, 2),
+            "high": round(max(open_price, close) * (1 + abs(rng.gauss(0, 0.006))), 2),
+            "low": round(min(open_price, close) * (1 - abs(rng.gauss(0, 0.006))), 2),
+            "close": round(close, 2),
+            "adjClose": round(close, 2),
+            "volume": int(rng.uniform(1e6, 5e7)),
+        })
+    bars.reverse()  # FMP lists the newest bar first
+    return bars
+
+def generate(dataset: str, symbol: str):
+    """
+    Generated FMP response body for one symbol, or the empty result for missing symbols.
+    """
+    if symbol.upper().startswith(MISSING_SYMBOL_PREFIX):
+        return {} if dataset == "historical-price-full" else []
+    if dataset == "historical-price-full":
+        return {"symbol": symbol, "historical": _history_bars(symbol)}
+
+    rng = _rng(symbol, dataset)
+    if dataset == "quote":
+        previous_close = rng.uniform(20, 500)
+        price = previous_close * (1 + rng.gauss(0, 0.015))
+        return [{
+            "symbol": symbol,
+            "price": round(price, 2),
+            "change": round(price - previous_close, 2),
+            "changesPercentage": round((price / previous_close - 1) * 100, 4),
+            "dayLow": round(min(price, previous_close) * 0.99, 2),
+            "dayHigh": round(max(price, previous_close) * 1.01, 2),
+            "open": round(previous_close * (1 + rng.gauss(0, 0.005)), 2),
+            "previousClose": round(previous_close, 2),
+            "volume": int(rng.uniform(1e6, 5e7)),
+            "timestamp": int(datetime.datetime.now(datetime.timezone.utc).timestamp()),
+        }]
+    if dataset == "profile":
+        return [{
+            "symbol": symbol,
+            "companyName": f"{symbol} Holdings Inc.",
+            "exchange": rng.choice(["NASDAQ", "NYSE"]),
+            "industry": "Software",
+            "sector": "Technology",
+            "ceo": "Jane Doe",
+            "website": f"https://www.{symbol.lower()}.example.com",
+            "description": f"{symbol} Holdings designs, builds and sells things. " * 20,
+            "fullTimeEmployees": str(int(rng.uniform(1e3, 2e5))),
+            "country": "US",
+            "ipoDate": "1999-05-04",
+            "mktCap": int(rng.uniform(1e9, 3e12)),
+        }]
+    if dataset == "key-metrics":
+        return [
+            {
+                "symbol": symbol,
+                "date": f"{datetime.date.today().year - years_back - 1}-12-31",
+                "revenuePerShare": round(rng.uniform(1, 100), 4),
+                "netIncomePerShare": round(rng.uniform(0.1, 20), 4),
+                "peRatio": round(rng.uniform(5, 60), 4),
+                "currentRatio": round(rng.uniform(0.5, 3), 4),
+                "debtToEquity": round(rng.uniform(0, 3), 4),
+                "dividendYield": round(rng.uniform(0, 0.05), 4),
+                "eps": round(rng.uniform(0.1, 20), 4),
+            }
+            for years_back in range(5)
+        ]
+    raise ValueError(f"Unknown dataset '{dataset}'")
+
+class FixtureStore:
+    """
+    Serves recorded responses from directory/<dataset>/<SYMBOL>.json when present,
+    generated ones otherwise. Generated history is memoized because it is the largest.
+    """
+
+    def __init__(self, directory: str | None = None):
+        self.directory = directory
+        self._generated: dict = {}
+
+    def get(self, dataset: str, symbol: str):
+        if self.directory:
+            path = os.path.join(self.directory, dataset, f"{symbol.upper()}.json")
+            if os.path.exists(path):
+                with open(path) as f:
+                    return json.load(f)
+        if dataset != "historical-price-full":
+            return generate(dataset, symbol)
+        key = symbol.upper()
+        if key not in self._generated:
+            self._generated[key] = generate(dataset, symbol)
+        return self._generated[key]
+
+def record(symbols: list[str], directory: str, api_key: str, base_url: str):
+    """
+    Saves live FMP responses for each symbol and dataset, for FixtureStore to replay.
+    """
+    with httpx.Client(timeout=30) as client:
+        for symbol in symbols:
+            for dataset in DATASETS:
+                params = {"apikey": api_key}
+                if dataset == "key-metrics":
+                    params["period"] = "annual"
+                response = client.get(f"{base_url}/{dataset}/{symbol}", params=params)
+                response.raise_for_status()
+                os.makedirs(os.path.join(directory, dataset), exist_ok=True)
+                with open(os.path.join(directory, dataset, f"{symbol.upper()}.json"), "w") as f:
+                    json.dump(response.json(), f)
+                print(f"Recorded {dataset} for {symbol}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    record_parser = subparsers.add_parser("record", help="Record live FMP responses as fixtures")
+    record_parser.add_argument("--symbols", default=",".join(DEFAULT_SYMBOLS))
+    record_parser.add_argument("--out", default=os.path.join(os.path.dirname(__file__), "recorded"))
+    record_parser.add_argument("--base-url", default="https://financialmodelingprep.com/api/v3")
+    args = parser.parse_args()
+
+    api_key = os.getenv("FMP_API_KEY")
+    if not api_key:
+        parser.error("FMP_API_KEY must be set to record fixtures")
+    record([symbol.strip() for symbol in args.symbols.split(",") if symbol.strip()], args.out, api_key, args.base_url)
+
+if __name__ == "__main__":
+    main()
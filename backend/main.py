@@ -5,9 +5,17 @@ from fastapi import FastAPI
 import uvicorn
 from fastapi.middleware.cors import CORSMiddleware
 from api.endpoints import stocks
-from app.database import create_db_and_tables
+from app.database import async_engine, async_session_maker, create_db_and_tables
+from app.core.password_hasher import password_hasher
+from app.crud import crud_watchlists
 from api.endpoints import users
 from api.endpoints import watchlists
+from api.endpoints import metrics as metrics_endpoint
+from api.endpoints import profiling as profiling_endpoint
+from services import fmp_client, profiling
+from services.metrics import MetricsMiddleware
+from services.quote_stream import quote_hub
+from services.scheduler import CacheScheduler
 import os
 
 app = FastAPI()
@@ -27,11 +35,33 @@ app.add_middleware(
     allow_methods=["*"], 
     allow_headers=["*"], 
 )
+app.add_middleware(MetricsMiddleware)
+# Off unless PROFILING_TOKEN (X-Profile header) or PROFILING_SAMPLE_RATE is set
+app.add_middleware(profiling.ProfilingMiddleware)
+profiling.instrument_engine(async_engine.sync_engine)
+
+async def get_watchlist_symbols() -> list[str]:
+    async with async_session_maker() as session:
+        return await crud_watchlists.get_all_watchlist_symbols_async(session)
+
+cache_scheduler = CacheScheduler(watchlist_symbols=get_watchlist_symbols)
 
 @app.on_event("startup") 
 def on_startup():
     create_db_and_tables()
 
+@app.on_event("startup")
+async def start_background_jobs():
+    cache_scheduler.start()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await cache_scheduler.stop()
+    await quote_hub.close()
+    await fmp_client.close_client()
+    await async_engine.dispose()
+    password_hasher.shutdown()
+
 @app.get("/")
 def hello():
     return {"message": "Hello! Your stock analysis tool is running with Alpha Vantage!"}
@@ -39,6 +69,8 @@ def hello():
 app.include_router(stocks.router, prefix="/api/v1")
 app.include_router(users.router, prefix="/api/v1/users")
 app.include_router(watchlists.router, prefix="/api/v1/watchlists")
+app.include_router(metrics_endpoint.router)
+app.include_router(profiling_endpoint.router, prefix=profiling.PROFILES_PATH)
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 10000))
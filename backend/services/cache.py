@@ -0,0 +1,459 @@
+import json
+import logging
+import os
+import pickle
+import sqlite3
+import stat
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+def estimate_size(value) -> int:
+    """
+    Approximate deep size of a cached value in bytes.
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item) for item in value)
+    elif hasattr(value, "__slots__"):
+        size += sum(estimate_size(getattr(value, name, None)) for name in value.__slots__)
+    return size
+
+class CacheEntry:
+    __slots__ = ("value", "size", "stored_at", "expires_at")
+
+    def __init__(self, value, size: int, stored_at: float, expires_at: float):
+        self.value = value
+        self.size = size
+        self.stored_at = stored_at
+        self.expires_at = expires_at
+
+class LRUCache:
+    """
+    In-process cache bounded by entry count and approximate byte size.
+    Every entry has its own TTL; the least recently used entries are evicted first.
+    Expired entries stay readable through peek() for stale_retention_seconds.
+    """
+
+    def __init__(self, max_bytes: int, max_entries: int, stale_retention_seconds: float = 0):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.stale_retention_seconds = stale_retention_seconds
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Returns the cached value, or None if it is missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            now = time.time()
+            if entry.expires_at <= now:
+                if entry.expires_at + self.stale_retention_seconds <= now:
+                    self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def peek(self, key) -> CacheEntry | None:
+        """
+        Returns the entry even if it has expired, as long as it is still retained.
+        Does not count as a hit or miss and does not refresh its LRU position.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at + self.stale_retention_seconds <= time.time():
+                return None
+            return entry
+
+    def set(self, key, value, ttl_seconds: float):
+        size = estimate_size(value)
+        now = time.time()
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                return  # Never worth evicting the whole cache for one value
+            self._entries[key] = CacheEntry(value, size, now, now + ttl_seconds)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes or len(self._entries) > self.max_entries:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self.current_bytes -= entry.size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+def ensure_private_directory(path: str):
+    """
+    Cached values are unpickled, so anyone able to write the cache file could run code in
+    this process. Creates the file's directory owner-only, and refuses one that another
+    user owns or can write to (such as the shared temp directory itself).
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    info = os.stat(directory)
+    if info.st_uid != os.getuid() or info.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise RuntimeError(
+            f"Refusing to use the SQLite cache at {path}: {directory} must be owned by this user "
+            f"and not writable by others. Set CACHE_SQLITE_PATH to a file in a private directory."
+        )
+
+def _open_sqlite(path: str, busy_timeout: float) -> sqlite3.Connection:
+    # WAL lets readers in other processes proceed during writes
+    conn = sqlite3.connect(path, timeout=busy_timeout, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+def _is_lock_error(error: sqlite3.OperationalError) -> bool:
+    message = str(error)
+    return "locked" in message or "busy" in message
+
+class SQLiteCache:
+    """
+    Cache stored in a local SQLite file so every worker process on the host shares it.
+    Calls run on the event loop, so they wait at most BUSY_TIMEOUT_SECONDS for another
+    process's write lock: a contended read counts as a miss and a contended write is skipped.
+    Reads never write. Last access is buffered in memory and, like pruning, written by a
+    background maintenance thread, which makes eviction approximate LRU.
+    Expired entries stay readable through peek() for stale_retention_seconds.
+    """
+
+    ACCESS_RESOLUTION_SECONDS = 30
+    PRUNE_EVERY_N_SETS = 100
+    BUSY_TIMEOUT_SECONDS = 0.05
+    MAINTENANCE_BUSY_TIMEOUT_SECONDS = 5
+    PRUNE_TARGET_FRACTION = 0.9  # Evict down to this share of the limits so prunes don't run back to back
+
+    def __init__(self, path: str, max_bytes: int, max_entries: int, stale_retention_seconds: float = 0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.stale_retention_seconds = stale_retention_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.lock_timeouts = 0
+        self._sets_since_prune = 0
+        self._local = threading.local()
+        self._touched: dict[str, float] = {}  # Keys read since the last maintenance pass, with the read time
+        self._maintenance_lock = threading.Lock()
+        self._maintenance_thread: threading.Thread | None = None
+        self._last_size = (0, 0)  # (entries, bytes) from the last successful count
+        ensure_private_directory(path)
+        conn = _open_sqlite(self.path, self.MAINTENANCE_BUSY_TIMEOUT_SECONDS)
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                " key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL,"
+                " stored_at REAL NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_cache_entries_accessed_at ON cache_entries (accessed_at)")
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        # One short-timeout connection per thread for the request path
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = _open_sqlite(self.path, self.BUSY_TIMEOUT_SECONDS)
+        return conn
+
+    def _execute(self, sql: str, parameters=()) -> sqlite3.Cursor | None:
+        """Runs one statement, or returns None if the database stayed locked past the busy timeout."""
+        try:
+            return self._connect().execute(sql, parameters)
+        except sqlite3.OperationalError as e:
+            if not _is_lock_error(e):
+                raise
+            self.lock_timeouts += 1
+            return None
+
+    @staticmethod
+    def _encode_key(key) -> str:
+        return json.dumps(key, default=str)
+
+    def get(self, key):
+        """
+        Returns the cached value, or None if it is missing or expired.
+        """
+        entry = self.get_entry(key)
+        if entry is None:
+            return None
+        return entry.value
+
+    def get_entry(self, key) -> CacheEntry | None:
+        encoded_key = self._encode_key(key)
+        cursor = self._execute(
+            "SELECT value, size, stored_at, expires_at, accessed_at FROM cache_entries WHERE key = ?",
+            (encoded_key,),
+        )
+        row = cursor.fetchone() if cursor is not None else None
+        now = time.time()
+        if row is None:
+            self.misses += 1
+            return None
+        value, size, stored_at, expires_at, accessed_at = row
+        if expires_at <= now:
+            # Left for the maintenance pass to delete once past stale retention
+            self.expirations += 1
+            self.misses += 1
+            return None
+        if now - accessed_at > self.ACCESS_RESOLUTION_SECONDS:
+            self._touched[encoded_key] = now
+        self.hits += 1
+        return CacheEntry(pickle.loads(value), size, stored_at, expires_at)
+
+    def peek(self, key) -> CacheEntry | None:
+        """
+        Returns the entry even if it has expired, as long as it is still retained.
+        """
+        cursor = self._execute(
+            "SELECT value, size, stored_at, expires_at FROM cache_entries WHERE key = ? AND expires_at > ?",
+            (self._encode_key(key), time.time() - self.stale_retention_seconds),
+        )
+        row = cursor.fetchone() if cursor is not None else None
+        if row is None:
+            return None
+        value, size, stored_at, expires_at = row
+        return CacheEntry(pickle.loads(value), size, stored_at, expires_at)
+
+    def set(self, key, value, ttl_seconds: float):
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(payload) > self.max_bytes:
+            return
+        now = time.time()
+        self._execute(
+            "INSERT OR REPLACE INTO cache_entries (key, value, size, stored_at, expires_at, accessed_at)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (self._encode_key(key), payload, len(payload), now, now + ttl_seconds, now),
+        )
+        self._sets_since_prune += 1
+        if self._sets_since_prune >= self.PRUNE_EVERY_N_SETS:
+            self._sets_since_prune = 0
+            self._start_maintenance()
+
+    def _start_maintenance(self):
+        with self._maintenance_lock:
+            if self._maintenance_thread is not None and self._maintenance_thread.is_alive():
+                return
+            self._maintenance_thread = threading.Thread(target=self.prune, name="sqlite-cache-prune", daemon=True)
+            self._maintenance_thread.start()
+
+    def prune(self):
+        """
+        Records buffered access times, drops entries past their stale retention, then the
+        least recently used ones until back under budget. Blocking; set() runs it in a
+        background thread every PRUNE_EVERY_N_SETS writes.
+        """
+        touched = self._touched
+        self._touched = {}
+        conn = _open_sqlite(self.path, self.MAINTENANCE_BUSY_TIMEOUT_SECONDS)
+        try:
+            conn.executemany(
+                "UPDATE cache_entries SET accessed_at = MAX(accessed_at, ?) WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in list(touched.items())],
+            )
+            cutoff = time.time() - self.stale_retention_seconds
+            conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (cutoff,))
+            entries, total_bytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries").fetchone()
+            if entries <= self.max_entries and total_bytes <= self.max_bytes:
+                return
+            target_entries = self.max_entries * self.PRUNE_TARGET_FRACTION
+            target_bytes = self.max_bytes * self.PRUNE_TARGET_FRACTION
+            doomed = []
+            # Walks the accessed_at index lazily and stops as soon as enough is evicted
+            cursor = conn.execute("SELECT key, size FROM cache_entries ORDER BY accessed_at")
+            for key, size in cursor:
+                if entries <= target_entries and total_bytes <= target_bytes:
+                    break
+                doomed.append((key,))
+                entries -= 1
+                total_bytes -= size
+            cursor.close()
+            conn.executemany("DELETE FROM cache_entries WHERE key = ?", doomed)
+            self.evictions += len(doomed)
+        except sqlite3.OperationalError as e:
+            logger.warning(f"SQLite cache maintenance skipped: {str(e)}")
+        finally:
+            conn.close()
+
+    def delete(self, key):
+        self._execute("DELETE FROM cache_entries WHERE key = ?", (self._encode_key(key),))
+
+    def clear(self):
+        self._touched = {}
+        self._connect().execute("DELETE FROM cache_entries")
+
+    def __len__(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+
+    def stats(self) -> dict:
+        cursor = self._execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries")
+        if cursor is not None:
+            self._last_size = cursor.fetchone()
+        entries, total_bytes = self._last_size
+        return {
+            "entries": entries,
+            "bytes": total_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "lock_timeouts": self.lock_timeouts,
+        }
+
+class TieredCache:
+    """
+    Small per-process LRU in front of a shared cache, so hot keys skip the shared
+    store. Local copies live at most local_ttl_seconds so they stay close to the shared copy.
+    """
+
+    def __init__(self, local: LRUCache, shared: SQLiteCache, local_ttl_seconds: float):
+        self.local = local
+        self.shared = shared
+        self.local_ttl_seconds = local_ttl_seconds
+
+    def get(self, key):
+        value = self.local.get(key)
+        if value is not None:
+            return value
+        entry = self.shared.get_entry(key)
+        if entry is None:
+            return None
+        self.local.set(key, entry.value, min(self.local_ttl_seconds, entry.expires_at - time.time()))
+        return entry.value
+
+    def peek(self, key) -> CacheEntry | None:
+        # The shared copy carries the real expiry; local copies are capped at local_ttl_seconds
+        return self.shared.peek(key)
+
+    def set(self, key, value, ttl_seconds: float):
+        self.shared.set(key, value, ttl_seconds)
+        self.local.set(key, value, min(self.local_ttl_seconds, ttl_seconds))
+
+    def delete(self, key):
+        self.shared.delete(key)
+        self.local.delete(key)
+
+    def clear(self):
+        self.shared.clear()
+        self.local.clear()
+
+    def __len__(self) -> int:
+        return len(self.shared)
+
+    def stats(self) -> dict:
+        return {**self.shared.stats(), "local": self.local.stats()}
+
+class VersionCounter:
+    """
+    Per-key version numbers for a single worker. bump() is called after every write,
+    so a cached copy tagged with an older version is known to be stale.
+    """
+
+    def __init__(self):
+        self._versions: dict = {}
+        self._lock = threading.Lock()
+
+    def current(self, key) -> int:
+        return self._versions.get(key, 0)
+
+    def bump(self, key) -> int:
+        with self._lock:
+            version = self._versions.get(key, 0) + 1
+            self._versions[key] = version
+            return version
+
+class SQLiteVersionCounter:
+    """
+    Per-key version numbers kept in a local SQLite file, so every worker on the host
+    sees a write made by any of them. Like SQLiteCache it runs on the event loop with a
+    short busy timeout: when another process holds the lock, current() and bump()
+    return None instead of waiting, and callers treat that as an unknown version.
+    """
+
+    def __init__(self, path: str, table: str):
+        self.path = path
+        self.table = table
+        self.lock_timeouts = 0
+        self._local = threading.local()
+        ensure_private_directory(path)
+        conn = _open_sqlite(path, SQLiteCache.MAINTENANCE_BUSY_TIMEOUT_SECONDS)
+        try:
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, version INTEGER NOT NULL)")
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = _open_sqlite(self.path, SQLiteCache.BUSY_TIMEOUT_SECONDS)
+        return conn
+
+    def _fetch_version(self, sql: str, key) -> int | None:
+        try:
+            row = self._connect().execute(sql, (json.dumps(key, default=str),)).fetchone()
+        except sqlite3.OperationalError as e:
+            if not _is_lock_error(e):
+                raise
+            self.lock_timeouts += 1
+            return None
+        return row[0] if row else 0
+
+    def current(self, key) -> int | None:
+        return self._fetch_version(f"SELECT version FROM {self.table} WHERE key = ?", key)
+
+    def bump(self, key) -> int | None:
+        return self._fetch_version(
+            f"INSERT INTO {self.table} (key, version) VALUES (?, 1)"
+            f" ON CONFLICT(key) DO UPDATE SET version = version + 1 RETURNING version",
+            key,
+        )
@@ -0,0 +1,89 @@
+import httpx
+import os
+import time
+
+from services import metrics, profiling
+from services.quota import fmp_quota
+
+# --- CONNECTION POOL SETUP ---
+# Every FMP call goes to the same host, so the pool-wide limits below are
+# effectively per-host limits.
+FMP_MAX_CONNECTIONS = int(os.getenv("FMP_MAX_CONNECTIONS", "20"))
+FMP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("FMP_MAX_KEEPALIVE_CONNECTIONS", "10"))
+FMP_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("FMP_KEEPALIVE_EXPIRY_SECONDS", "30"))
+FMP_TIMEOUT_SECONDS = float(os.getenv("FMP_TIMEOUT_SECONDS", "10"))
+FMP_HTTP2_ENABLED = os.getenv("FMP_HTTP2_ENABLED", "true").lower() == "true"
+
+_client: httpx.AsyncClient | None = None
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Returns the shared pooled FMP client, creating it on first use.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=FMP_HTTP2_ENABLED,
+            limits=httpx.Limits(
+                max_connections=FMP_MAX_CONNECTIONS,
+                max_keepalive_connections=FMP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=FMP_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            timeout=httpx.Timeout(FMP_TIMEOUT_SECONDS),
+        )
+    return _client
+
+async def close_client():
+    """
+    Closes the shared client and its pooled connections (called on app shutdown).
+    """
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+def is_rate_limit_response(data) -> bool:
+    """True if an FMP JSON body says the plan's request limit was hit."""
+    if isinstance(data, dict):
+        for field in ("Error Message", "message"):
+            message = str(data.get(field, "")).lower()
+            if "limit" in message or "exceeded" in message or "upgrade" in message:
+                return True
+    return False
+
+def _retry_after_seconds(response: httpx.Response) -> float | None:
+    try:
+        return float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return None
+
+async def get_json(url: str, dataset: str = "other"):
+    """
+    Performs a GET on the shared client and returns the decoded JSON body.
+    Every call first takes a token from the FMP quota (raising QuotaExceeded when
+    none is available), and throttling responses trip the quota's circuit breaker.
+    Latency and outcome are recorded per dataset in the /metrics counters.
+    Raises httpx.HTTPError on transport errors and non-2xx responses.
+    """
+    await fmp_quota.acquire()
+    throttled = False
+    retry_after = None
+    outcome = "transport_error"
+    start = time.perf_counter()
+    try:
+        with profiling.phase("upstream"):
+            response = await get_client().get(url)
+        if response.status_code == 429:
+            throttled = True
+            retry_after = _retry_after_seconds(response)
+        outcome = "http_error"
+        response.raise_for_status()
+        with profiling.phase("decode"):
+            data = response.json()
+        throttled = is_rate_limit_response(data)
+        outcome = "ok"
+        return data
+    finally:
+        fmp_quota.record_result(throttled, retry_after, succeeded=outcome == "ok")
+        metrics.fmp_request_duration.observe(time.perf_counter() - start, dataset=dataset)
+        metrics.fmp_requests.inc(dataset=dataset, outcome="rate_limited" if throttled else outcome)
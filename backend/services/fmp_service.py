@@ -1,25 +1,144 @@
-import requests
+import asyncio
+import httpx
 import os
-import time
+import re
 import datetime
+import tempfile
+import time
+from collections import OrderedDict
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-# --- CACHING SETUP ---
-_api_cache = {}
-CACHE_TTL_SECONDS = 300  # 5 minutes
-FMP_BASE_URL = "https://financialmodelingprep.com/api/v3"
+from services import fmp_client, profiling, quota
+from services.cache import LRUCache, SQLiteCache, TieredCache
+from services.price_history import PriceHistory
+from services.quota import QuotaExceeded, fmp_quota
+from services.records import CompanyProfile, KeyMetrics, Quote
+from services.singleflight import SingleFlight
 
-def _is_cache_valid(cache_entry: dict) -> bool:
-    if not cache_entry:
-        return False
-    return (time.time() - cache_entry["timestamp"]) < CACHE_TTL_SECONDS
+# --- CACHING SETUP ---
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))  # 64 MB
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+# "memory" keeps a private cache per worker; "sqlite" shares one cache file between all workers on the host
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+# The default lives in a per-user directory that SQLiteCache creates owner-only
+CACHE_SQLITE_PATH = os.getenv(
+    "CACHE_SQLITE_PATH", os.path.join(tempfile.gettempdir(), f"profit_grid-{os.getuid()}", "cache.sqlite3")
+)
+CACHE_LOCAL_TTL_SECONDS = float(os.getenv("CACHE_LOCAL_TTL_SECONDS", "5"))
+# Expired entries are kept (within the byte budget) so history can be refreshed incrementally
+CACHE_STALE_RETENTION_SECONDS = float(os.getenv("CACHE_STALE_RETENTION_SECONDS", str(7 * 24 * 3600)))
+
+def _create_api_cache():
+    if CACHE_BACKEND == "sqlite":
+        return TieredCache(
+            local=LRUCache(max_bytes=CACHE_MAX_BYTES // 4, max_entries=CACHE_MAX_ENTRIES),
+            shared=SQLiteCache(
+                CACHE_SQLITE_PATH,
+                max_bytes=CACHE_MAX_BYTES,
+                max_entries=CACHE_MAX_ENTRIES,
+                stale_retention_seconds=CACHE_STALE_RETENTION_SECONDS,
+            ),
+            local_ttl_seconds=CACHE_LOCAL_TTL_SECONDS,
+        )
+    return LRUCache(
+        max_bytes=CACHE_MAX_BYTES,
+        max_entries=CACHE_MAX_ENTRIES,
+        stale_retention_seconds=CACHE_STALE_RETENTION_SECONDS,
+    )
+
+_api_cache = _create_api_cache()
+
+# TTLs per dataset. Historical bars are handled by _seconds_until_history_refresh()
+CACHE_TTL_SECONDS = {
+    "FMP_QUOTE": int(os.getenv("CACHE_TTL_QUOTE_SECONDS", "15")),
+    "FMP_COMPANY_PROFILE": int(os.getenv("CACHE_TTL_PROFILE_SECONDS", str(24 * 3600))),  # 1 day
+    "FMP_KEY_METRICS": int(os.getenv("CACHE_TTL_KEY_METRICS_SECONDS", str(12 * 3600))),  # 12 hours
+}
+# Overridable so benchmarks can point the service at a local stand-in server
+FMP_BASE_URL = os.getenv("FMP_BASE_URL", "https://financialmodelingprep.com/api/v3").rstrip("/")
+FMP_BATCH_QUOTE_CHUNK_SIZE = int(os.getenv("FMP_BATCH_QUOTE_CHUNK_SIZE", "50"))  # Symbols per multi-quote call
+
+# Daily bars only change once the US session closes and FMP publishes the new bar
+try:
+    MARKET_TIMEZONE = ZoneInfo("America/New_York")
+except ZoneInfoNotFoundError:
+    MARKET_TIMEZONE = datetime.timezone(datetime.timedelta(hours=-5))
+HISTORY_REFRESH_TIME = datetime.time(16, 30)  # Market close plus time for the EOD bar to land
+# Expired history is refreshed with only the bars since the last known date
+HISTORY_INCREMENTAL_REFRESH = os.getenv("HISTORY_INCREMENTAL_REFRESH", "true").lower() == "true"
+_history_refresh_stats = {"full": 0, "incremental": 0, "adjustment_reloads": 0}
+
+# Concurrent cache misses for the same key share one upstream call
+_fmp_flight = SingleFlight()
+
+# --- NEGATIVE CACHING SETUP ---
+# Definitive "no such data" answers are cached briefly, apart from real data, so typo'd or
+# delisted symbols don't reach FMP on every lookup. Transient errors are never cached. FMP's
+# empty answers can't always be told apart from a throttled one, so the TTLs stay short.
+NEGATIVE_CACHE_TTL_SECONDS = {
+    "FMP_QUOTE": int(os.getenv("NEGATIVE_TTL_QUOTE_SECONDS", "60")),
+    "FMP_HISTORICAL_DAILY": int(os.getenv("NEGATIVE_TTL_HISTORY_SECONDS", "300")),  # 5 minutes
+    "FMP_COMPANY_PROFILE": int(os.getenv("NEGATIVE_TTL_PROFILE_SECONDS", "300")),  # 5 minutes
+    "FMP_KEY_METRICS": int(os.getenv("NEGATIVE_TTL_KEY_METRICS_SECONDS", "300")),  # 5 minutes
+}
+_negative_cache = LRUCache(max_bytes=1024 * 1024, max_entries=5000)
+# Tickers, indices and crypto/forex pairs as FMP spells them, e.g. AAPL, BRK-B, RY.TO, ^GSPC, BTCUSD
+_SYMBOL_PATTERN = re.compile(r"^\^?[A-Z0-9][A-Z0-9.\-=]{0,14}$", re.IGNORECASE)
+_negative_stats = {"rejected_symbols": 0}
+
+class NotFoundResult(dict):
+    """An error response for data FMP definitively doesn't have, as opposed to a transient failure."""
+
+def _not_found(message: str) -> NotFoundResult:
+    return NotFoundResult({"Error Message": message})
+
+def is_error(data) -> bool:
+    """Successful results are records (or the history dict); failures are {"Error Message": ...} dicts."""
+    return isinstance(data, dict) and "Error Message" in data
+
+def is_valid_symbol(symbol: str) -> bool:
+    """Cheap shape check so obvious garbage is rejected before any upstream call."""
+    return bool(_SYMBOL_PATTERN.match(symbol))
+
+# --- STALE-WHILE-REVALIDATE / REFRESH-AHEAD SETUP ---
+# How long after expiry an entry may still be served while a background refresh runs
+STALE_WHILE_REVALIDATE_SECONDS = {
+    "FMP_QUOTE": int(os.getenv("STALE_QUOTE_SECONDS", "60")),
+    "FMP_HISTORICAL_DAILY": int(os.getenv("STALE_HISTORY_SECONDS", str(6 * 3600))),  # 6 hours
+    "FMP_COMPANY_PROFILE": int(os.getenv("STALE_PROFILE_SECONDS", str(7 * 24 * 3600))),  # 7 days
+    "FMP_KEY_METRICS": int(os.getenv("STALE_KEY_METRICS_SECONDS", str(7 * 24 * 3600))),  # 7 days
+}
+REFRESH_AHEAD_FRACTION = 0.2  # Hot keys are refreshed in the last 20% of their TTL
+HOT_KEY_MIN_READS = 2  # Decayed read count that makes a key "hot"
+MAX_TRACKED_KEYS = 2000
+_key_loaders: OrderedDict = OrderedDict()  # cache_key -> loader, least recently read first
+_key_reads: dict = {}
+_background_refreshes: set = set()
+_refresh_stats = {
+    "stale_served": 0, "background_refreshes": 0, "throttled_refreshes": 0,
+    "skipped_refreshes": 0, "served_while_throttled": 0,
+}
+
+def _seconds_until_history_refresh(now: datetime.datetime | None = None) -> float:
+    """Seconds until the next weekday HISTORY_REFRESH_TIME in the market timezone."""
+    now = now or datetime.datetime.now(MARKET_TIMEZONE)
+    refresh_at = datetime.datetime.combine(now.date(), HISTORY_REFRESH_TIME, tzinfo=MARKET_TIMEZONE)
+    while refresh_at <= now or refresh_at.weekday() >= 5:
+        refresh_at += datetime.timedelta(days=1)
+    return refresh_at.timestamp() - now.timestamp()
+
+def _cache_ttl_seconds(dataset: str) -> float:
+    if dataset == "FMP_HISTORICAL_DAILY":
+        return _seconds_until_history_refresh()
+    return CACHE_TTL_SECONDS[dataset]
 
 FMP_API_KEY = os.getenv("FMP_API_KEY")
 
-if not FMP_API_KEY:
-    raise ValueError("FMP_API_KEY not found in environment variables. Please set it in your .env file.")
-
 def _add_api_key_to_url(url: str) -> str:
     """Adds the FMP API key as a query parameter, handling existing parameters."""
+    # Checked per call rather than at import, so the app can start (and serve cached data) without a key
+    if not FMP_API_KEY:
+        raise ValueError("FMP_API_KEY not found in environment variables. Please set it in your .env file.")
     if "?" in url:
         return f"{url}&apikey={FMP_API_KEY}"
     else:
@@ -27,241 +146,440 @@ def _add_api_key_to_url(url: str) -> str:
 
 def _check_fmp_rate_limit(data):
     """Check if the response indicates a rate limit has been hit."""
-    if isinstance(data, dict):
-        if "Error Message" in data:
-            error_msg = data["Error Message"].lower()
-            if "limit" in error_msg or "exceeded" in error_msg or "upgrade" in error_msg:
-                return True
-        
-        if "message" in data:
-            msg = data["message"].lower()
-            if "limit" in msg or "exceeded" in msg or "upgrade" in msg:
-                return True
-    
-    if isinstance(data, list) and len(data) == 0: # FMP sometimes returns empty list on rate limit
-        return True
-    
-    return False
-
-def fetch_global_quote(symbol: str):
-    cache_key = ("FMP_QUOTE", symbol)
-
-    cached_data = _api_cache.get(cache_key)
-    if cached_data and _is_cache_valid(cached_data):
-        return cached_data["data"]
-    
+    return fmp_client.is_rate_limit_response(data)
+
+async def _cached_fetch(cache_key: tuple, loader):
+    """
+    Serves cache_key from the cache, otherwise runs loader() once for all
+    concurrent callers and caches its result unless it is an error. A recently
+    expired entry is served as-is while a background refresh replaces it, and any
+    retained entry is served while the FMP quota refuses or throttles calls.
+    Invalid symbols and recent not-found answers never reach the loader.
+    """
+    if not is_valid_symbol(cache_key[1]):
+        _negative_stats["rejected_symbols"] += 1
+        return _not_found(f"Invalid symbol '{cache_key[1]}'")
+
+    not_found = _negative_cache.get(cache_key)
+    if not_found is not None:
+        return not_found
+
+    _track_key(cache_key, loader)
+
+    with profiling.phase("cache"):
+        cached_data = _api_cache.get(cache_key)
+        stale_entry = _api_cache.peek(cache_key) if cached_data is None else None
+    if cached_data is not None:
+        return cached_data
+
+    if stale_entry is not None and time.time() - stale_entry.expires_at <= STALE_WHILE_REVALIDATE_SECONDS.get(cache_key[0], 0):
+        _refresh_in_background(cache_key, loader)
+        _refresh_stats["stale_served"] += 1
+        return stale_entry.value
+
+    try:
+        data = await _fmp_flight.do(cache_key, lambda: _load_and_cache(cache_key, loader))
+    except QuotaExceeded as e:
+        return _retained_or_error(cache_key, {"Error Message": str(e)})
+    if is_error(data) and fmp_quota.is_throttled():
+        return _retained_or_error(cache_key, data)
+    return data
+
+def _retained_or_error(cache_key: tuple, error_response: dict):
+    """Falls back to any retained copy of cache_key, however stale, instead of an error."""
+    entry = _api_cache.peek(cache_key)
+    if entry is None:
+        return error_response
+    _refresh_stats["served_while_throttled"] += 1
+    return entry.value
+
+async def _load_and_cache(cache_key: tuple, loader):
+    data = await loader()
+    if isinstance(data, NotFoundResult):
+        _negative_cache.set(cache_key, data, NEGATIVE_CACHE_TTL_SECONDS[cache_key[0]])
+    elif not is_error(data):
+        with profiling.phase("cache"):
+            _api_cache.set(cache_key, data, _cache_ttl_seconds(cache_key[0]))
+    return data
+
+def _track_key(cache_key: tuple, loader):
+    """Remembers how to reload a key and counts its reads, for refresh-ahead."""
+    _key_loaders[cache_key] = loader
+    _key_loaders.move_to_end(cache_key)
+    _key_reads[cache_key] = _key_reads.get(cache_key, 0) + 1
+    if len(_key_loaders) > MAX_TRACKED_KEYS:
+        oldest_key, _ = _key_loaders.popitem(last=False)
+        _key_reads.pop(oldest_key, None)
+
+def _refresh_in_background(cache_key: tuple, loader) -> bool:
+    if _fmp_flight.in_flight(cache_key):
+        return False
+    if not fmp_quota.has_budget(quota.Priority.BACKGROUND):
+        # Refreshing is optional; leave the reserved budget to interactive calls
+        _refresh_stats["skipped_refreshes"] += 1
+        return False
+    # The task copies the current context, so its upstream calls run at background priority
+    with quota.priority(quota.Priority.BACKGROUND):
+        task = asyncio.create_task(_background_refresh(cache_key, loader))
+    _background_refreshes.add(task)
+    task.add_done_callback(_background_refreshes.discard)
+    _refresh_stats["background_refreshes"] += 1
+    return True
+
+async def _background_refresh(cache_key: tuple, loader):
+    try:
+        await _fmp_flight.do(cache_key, lambda: _load_and_cache(cache_key, loader))
+    except QuotaExceeded:
+        _refresh_stats["throttled_refreshes"] += 1
+
+def refresh_hot_keys(lead_seconds: float = 0) -> int:
+    """
+    Starts background refreshes for frequently read keys that are close to expiry:
+    within REFRESH_AHEAD_FRACTION of their TTL, or lead_seconds, whichever is longer.
+    Read counts decay by half on every call. Returns the number of refreshes started.
+    """
+    now = time.time()
+    refreshed = 0
+    for cache_key, reads in list(_key_reads.items()):
+        if reads >= HOT_KEY_MIN_READS:
+            entry = _api_cache.peek(cache_key)
+            if entry is not None:
+                ttl = entry.expires_at - entry.stored_at
+                if entry.expires_at - now <= max(ttl * REFRESH_AHEAD_FRACTION, lead_seconds):
+                    if _refresh_in_background(cache_key, _key_loaders[cache_key]):
+                        refreshed += 1
+        if reads < 1:
+            del _key_reads[cache_key]
+        else:
+            _key_reads[cache_key] = reads / 2
+    return refreshed
+
+def cache_freshness(cache_keys: list[tuple]) -> tuple[list[float], int] | None:
+    """
+    Version (stored_at) of each cached entry and the whole seconds until the first of
+    them expires, for HTTP validators. None if any key has no cached entry.
+    """
+    entries = [_api_cache.peek(cache_key) for cache_key in cache_keys]
+    if not entries or any(entry is None for entry in entries):
+        return None
+    seconds_left = min(entry.expires_at for entry in entries) - time.time()
+    return [entry.stored_at for entry in entries], max(0, int(seconds_left))
+
+def get_service_stats() -> dict:
+    return {
+        "cache": _api_cache.stats(),
+        "singleflight": _fmp_flight.stats(),
+        "history_refreshes": dict(_history_refresh_stats),
+        "refreshes": {**_refresh_stats, "tracked_keys": len(_key_loaders)},
+        "quota": fmp_quota.stats(),
+        "negative_cache": {**_negative_cache.stats(), **_negative_stats},
+    }
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+def _format_quote(quote_data: dict, symbol: str) -> Quote:
+    """Converts one FMP quote object into a typed Quote record."""
+    # Format the timestamp to a readable date
+    raw_timestamp = quote_data.get("timestamp", None)
+    if raw_timestamp:
+        try:
+            last_updated = datetime.datetime.utcfromtimestamp(int(raw_timestamp)).strftime('%Y-%m-%d %H:%M:%S UTC')
+        except Exception:
+            last_updated = str(raw_timestamp)
+    else:
+        last_updated = "Unknown"
+
+    # Round change percent to two decimals
+    changes_percentage = quote_data.get('changesPercentage', 0)
+    try:
+        changes_percentage = round(float(changes_percentage), 2)
+    except Exception:
+        changes_percentage = 0.0
+
+    return Quote(
+        symbol=quote_data.get("symbol", symbol),
+        price=_to_float(quote_data.get("price")),
+        change=_to_float(quote_data.get("change")),
+        change_percent=changes_percentage,
+        last_updated=last_updated,
+        open_price=_to_float(quote_data.get("open")),
+        high=_to_float(quote_data.get("dayHigh")),
+        low=_to_float(quote_data.get("dayLow")),
+        volume=int(_to_float(quote_data.get("volume"))),
+        previous_close=_to_float(quote_data.get("previousClose")),
+    )
+
+async def fetch_global_quote(symbol: str):
+    return await _cached_fetch(("FMP_QUOTE", symbol), lambda: _load_global_quote(symbol))
+
+async def _load_global_quote(symbol: str):
     try:
         url = f"{FMP_BASE_URL}/quote/{symbol}"
         full_url = _add_api_key_to_url(url)
         
-        response = requests.get(full_url)
-        response.raise_for_status()
-        data = response.json()
+        data = await fmp_client.get_json(full_url, dataset="FMP_QUOTE")
         
         if _check_fmp_rate_limit(data):
             return {"Error Message": "FMP API rate limit reached. Please try again later."}
         
         if not data or not isinstance(data, list) or len(data) == 0:
-            return {"Error Message": f"No quote data found for {symbol}"}
+            return _not_found(f"No quote data found for {symbol}")
 
         quote_data = data[0]
         
         if not quote_data or "symbol" not in quote_data:
-            return {"Error Message": f"Invalid data structure returned for {symbol}"}
-
-        # Format the timestamp to a readable date
-        raw_timestamp = quote_data.get("timestamp", None)
-        if raw_timestamp:
-            try:
-                last_updated = datetime.datetime.utcfromtimestamp(int(raw_timestamp)).strftime('%Y-%m-%d %H:%M:%S UTC')
-            except Exception:
-                last_updated = str(raw_timestamp)
-        else:
-            last_updated = "Unknown"
+            return _not_found(f"Invalid data structure returned for {symbol}")
 
-        # Round change percent to two decimals
-        changes_percentage = quote_data.get('changesPercentage', 0)
-        try:
-            changes_percentage = round(float(changes_percentage), 2)
-        except Exception:
-            changes_percentage = 0.0
-
-        # Create the formatted response that matches what the router expects
-        formatted_response = {
-            "Global Quote": {
-                "01. symbol": quote_data.get("symbol", symbol),
-                "05. price": str(quote_data.get("price", 0)),
-                "09. change": str(quote_data.get("change", 0)),
-                "10. change percent": f"{changes_percentage}%",
-                "07. latest trading day": last_updated,
-                "02. open": str(quote_data.get("open", 0)),
-                "03. high": str(quote_data.get("dayHigh", 0)),
-                "04. low": str(quote_data.get("dayLow", 0)),
-                "06. volume": str(quote_data.get("volume", 0)),
-                "08. previous close": str(quote_data.get("previousClose", 0))
-            }
-        }
-
-        # Cache the formatted response
-        _api_cache[cache_key] = {"data": formatted_response, "timestamp": time.time()}
-        
-        return formatted_response
+        return _format_quote(quote_data, symbol)
 
-    except requests.exceptions.RequestException as e:
+    except QuotaExceeded:
+        raise
+    except httpx.HTTPError as e:
         return {"Error Message": f"Failed to fetch data for {symbol}: {str(e)}"}
     except Exception as e:
         return {"Error Message": f"Unexpected error fetching data for {symbol}: {str(e)}"}
 
-def fetch_daily_time_series(symbol: str):
-    cache_key = ("FMP_HISTORICAL_DAILY", symbol)
+async def fetch_batch_quotes(symbols: list[str]) -> dict:
+    """
+    Returns {symbol: quote or error dict} for many symbols. Cached quotes are served
+    from _api_cache; the rest use FMP's comma-separated /quote/ form, one call per chunk.
+    """
+    results = {}
+    missing = []
+    for symbol in symbols:
+        if not is_valid_symbol(symbol):
+            _negative_stats["rejected_symbols"] += 1
+            results[symbol] = _not_found(f"Invalid symbol '{symbol}'")
+            continue
+        with profiling.phase("cache"):
+            cached_data = _api_cache.get(("FMP_QUOTE", symbol)) or _negative_cache.get(("FMP_QUOTE", symbol))
+        if cached_data is not None:
+            results[symbol] = cached_data
+        elif symbol not in missing:
+            missing.append(symbol)
+
+    chunks = [missing[i:i + FMP_BATCH_QUOTE_CHUNK_SIZE] for i in range(0, len(missing), FMP_BATCH_QUOTE_CHUNK_SIZE)]
+    chunk_results = await asyncio.gather(*[
+        _fmp_flight.do(("FMP_QUOTE_BATCH", *chunk), lambda chunk=chunk: _load_batch_quotes(chunk))
+        for chunk in chunks
+    ])
+    for chunk_result in chunk_results:
+        results.update(chunk_result)
+
+    return results
+
+async def _load_batch_quotes(symbols: list[str]) -> dict:
+    joined_symbols = ",".join(symbols)
+    try:
+        url = f"{FMP_BASE_URL}/quote/{joined_symbols}"
+        full_url = _add_api_key_to_url(url)
+
+        data = await fmp_client.get_json(full_url, dataset="FMP_QUOTE")
 
-    cached_data = _api_cache.get(cache_key)
-    if cached_data and _is_cache_valid(cached_data):
-        return cached_data["data"]
-    
+        if _check_fmp_rate_limit(data):
+            rate_limit_error = {"Error Message": "FMP API rate limit reached. Please try again later."}
+            return {symbol: _retained_or_error(("FMP_QUOTE", symbol), rate_limit_error) for symbol in symbols}
+
+        if not isinstance(data, list):
+            return {symbol: {"Error Message": f"Invalid data structure returned for {symbol}"} for symbol in symbols}
+
+        results = {}
+        for quote_data in data:
+            if not quote_data or "symbol" not in quote_data:
+                continue
+            symbol = quote_data["symbol"]
+            with profiling.phase("transform"):
+                formatted_response = _format_quote(quote_data, symbol)
+            with profiling.phase("cache"):
+                _api_cache.set(("FMP_QUOTE", symbol), formatted_response, _cache_ttl_seconds("FMP_QUOTE"))
+            results[symbol] = formatted_response
+
+        # An entirely empty reply may be FMP throttling or failing, so it proves nothing about any one symbol
+        answered = bool(results)
+        for symbol in symbols:
+            if symbol in results:
+                continue
+            if not answered:
+                results[symbol] = {"Error Message": f"No quote data found for {symbol}"}
+                continue
+            results[symbol] = _not_found(f"No quote data found for {symbol}")
+            _negative_cache.set(("FMP_QUOTE", symbol), results[symbol], NEGATIVE_CACHE_TTL_SECONDS["FMP_QUOTE"])
+
+        return results
+
+    except QuotaExceeded as e:
+        return {symbol: _retained_or_error(("FMP_QUOTE", symbol), {"Error Message": str(e)}) for symbol in symbols}
+    except httpx.HTTPError as e:
+        return {symbol: {"Error Message": f"Failed to fetch data for {symbol}: {str(e)}"} for symbol in symbols}
+    except Exception as e:
+        return {symbol: {"Error Message": f"Unexpected error fetching data for {symbol}: {str(e)}"} for symbol in symbols}
+
+async def fetch_daily_time_series(symbol: str):
+    return await _cached_fetch(("FMP_HISTORICAL_DAILY", symbol), lambda: _load_daily_time_series(symbol))
+
+async def _load_daily_time_series(symbol: str):
+    """
+    Refreshes history incrementally from the last known bar when an expired copy is
+    still retained, and falls back to a full download otherwise.
+    """
+    previous_entry = _api_cache.peek(("FMP_HISTORICAL_DAILY", symbol))
+    if HISTORY_INCREMENTAL_REFRESH and previous_entry is not None:
+        previous_history = previous_entry.value["Time Series (Daily)"]
+        updated_response = await _load_daily_time_series_update(symbol, previous_history)
+        if updated_response is not None:
+            return updated_response
+
+    _history_refresh_stats["full"] += 1
+    with quota.priority(quota.Priority.BULK):
+        return await _load_daily_time_series_range(symbol)
+
+async def _load_daily_time_series_update(symbol: str, previous_history: PriceHistory):
+    """
+    Fetches only the bars since the last known date and merges them in. Returns None
+    when a full reload is needed (the last known bar changed, e.g. after a split).
+    """
+    last_date = previous_history.dates[-1]
+    update_response = await _load_daily_time_series_range(symbol, since=str(last_date))
+    if isinstance(update_response, NotFoundResult):
+        return None  # Not even the last known bar came back; reload in full
+    if is_error(update_response):
+        return update_response
+
+    new_history = update_response["Time Series (Daily)"]
+    if not previous_history.matches_bar(new_history, last_date):
+        _history_refresh_stats["adjustment_reloads"] += 1
+        return None
+
+    _history_refresh_stats["incremental"] += 1
+    return {"Time Series (Daily)": previous_history.merge_newer(new_history)}
+
+async def _load_daily_time_series_range(symbol: str, since: str | None = None):
     try:
         url = f"{FMP_BASE_URL}/historical-price-full/{symbol}"
+        if since:
+            url = f"{url}?from={since}"
         full_url = _add_api_key_to_url(url)
         
-        response = requests.get(full_url)
-        response.raise_for_status()
-        data = response.json()
+        data = await fmp_client.get_json(full_url, dataset="FMP_HISTORICAL_DAILY")
         
         if _check_fmp_rate_limit(data):
             return {"Error Message": "FMP API rate limit reached. Please try again later."}
 
         if not data or "historical" not in data or not isinstance(data["historical"], list):
-            return {"Error Message": f"No historical data found for {symbol}"}
+            return _not_found(f"No historical data found for {symbol}")
 
         historical_data = data["historical"]
         
         if not historical_data:
-            return {"Error Message": f"No historical data available for {symbol}"}
-
-        # Convert FMP format to the format expected by the router
-        formatted_historical = []
-        for day_data in historical_data:
-            formatted_day = {
-                "date": day_data.get("date", ""),
-                "close": str(day_data.get("close", 0)),
-                "volume": str(day_data.get("volume", 0)),
-                "high": str(day_data.get("high", 0)),
-                "low": str(day_data.get("low", 0)),
-                "open": str(day_data.get("open", 0))
-            }
-            formatted_historical.append(formatted_day)
-
-        formatted_response = {"Time Series (Daily)": formatted_historical}
-
-        # Cache the formatted response
-        _api_cache[cache_key] = {"data": formatted_response, "timestamp": time.time()}
-        
+            return _not_found(f"No historical data available for {symbol}")
+
+        # Validate and convert once at ingest into typed columnar arrays
+        with profiling.phase("transform"):
+            history = PriceHistory.from_fmp_bars(historical_data)
+
+        if len(history) == 0:
+            return _not_found(f"No valid historical data available for {symbol}")
+
+        formatted_response = {"Time Series (Daily)": history}
+
         return formatted_response
 
-    except requests.exceptions.RequestException as e:
+    except QuotaExceeded:
+        raise
+    except httpx.HTTPError as e:
         return {"Error Message": f"Failed to fetch historical data for {symbol}: {str(e)}"}
     except Exception as e:
         return {"Error Message": f"Unexpected error fetching historical data for {symbol}: {str(e)}"}
 
-def fetch_company_profile(symbol: str):
-    cache_key = ("FMP_COMPANY_PROFILE", symbol)
+async def fetch_company_profile(symbol: str):
+    return await _cached_fetch(("FMP_COMPANY_PROFILE", symbol), lambda: _load_company_profile(symbol))
 
-    cached_data = _api_cache.get(cache_key)
-    if cached_data and _is_cache_valid(cached_data):
-        return cached_data["data"]
-    
+async def _load_company_profile(symbol: str):
     try:
         url = f"{FMP_BASE_URL}/profile/{symbol}"
         full_url = _add_api_key_to_url(url)
         
-        response = requests.get(full_url)
-        response.raise_for_status()
-        data = response.json()
+        data = await fmp_client.get_json(full_url, dataset="FMP_COMPANY_PROFILE")
         
         if _check_fmp_rate_limit(data):
             return {"Error Message": "FMP API rate limit reached. Please try again later."}
 
         if not data or not isinstance(data, list) or len(data) == 0:
-            return {"Error Message": f"No company profile data found for {symbol}"}
+            return _not_found(f"No company profile data found for {symbol}")
 
         profile_data = data[0]
         
         if not profile_data or "symbol" not in profile_data:
-            return {"Error Message": f"Invalid data structure returned for {symbol} profile"}
-
-        formatted_response = {
-            "Company Profile": {
-                "Symbol": profile_data.get("symbol", symbol),
-                "Company Name": profile_data.get("companyName", "N/A"),
-                "Exchange": profile_data.get("exchange", "N/A"),
-                "Industry": profile_data.get("industry", "N/A"),
-                "Sector": profile_data.get("sector", "N/A"),
-                "CEO": profile_data.get("ceo", "N/A"),
-                "Website": profile_data.get("website", "N/A"),
-                "Description": profile_data.get("description", "N/A"),
-                "Full Time Employees": profile_data.get("fullTimeEmployees", "N/A"),
-                "Country": profile_data.get("country", "N/A"),
-                "IPODate": profile_data.get("ipoDate", "N/A"),
-                "Market Cap": profile_data.get("mktCap", "N/A")
-            }
-        }
-
-        _api_cache[cache_key] = {"data": formatted_response, "timestamp": time.time()}
-        
+            return _not_found(f"Invalid data structure returned for {symbol} profile")
+
+        formatted_response = CompanyProfile(
+            symbol=profile_data.get("symbol", symbol),
+            company_name=profile_data.get("companyName", "N/A"),
+            exchange=profile_data.get("exchange", "N/A"),
+            industry=profile_data.get("industry", "N/A"),
+            sector=profile_data.get("sector", "N/A"),
+            ceo=profile_data.get("ceo", "N/A"),
+            website=profile_data.get("website", "N/A"),
+            description=profile_data.get("description", "N/A"),
+            full_time_employees=profile_data.get("fullTimeEmployees", "N/A"),
+            country=profile_data.get("country", "N/A"),
+            ipo_date=profile_data.get("ipoDate", "N/A"),
+            market_cap=profile_data.get("mktCap", "N/A"),
+        )
+
         return formatted_response
 
-    except requests.exceptions.RequestException as e:
+    except QuotaExceeded:
+        raise
+    except httpx.HTTPError as e:
         return {"Error Message": f"Failed to fetch company profile for {symbol}: {str(e)}"}
     except Exception as e:
         return {"Error Message": f"Unexpected error fetching company profile for {symbol}: {str(e)}"}
 
-def fetch_key_metrics(symbol: str):
-    cache_key = ("FMP_KEY_METRICS", symbol)
+async def fetch_key_metrics(symbol: str):
+    return await _cached_fetch(("FMP_KEY_METRICS", symbol), lambda: _load_key_metrics(symbol))
 
-    cached_data = _api_cache.get(cache_key)
-    if cached_data and _is_cache_valid(cached_data):
-        return cached_data["data"]
-    
+async def _load_key_metrics(symbol: str):
     try:
         # FMP Key Metrics endpoint, requesting annual data
         url = f"{FMP_BASE_URL}/key-metrics/{symbol}?period=annual" 
         full_url = _add_api_key_to_url(url)
         
-        response = requests.get(full_url)
-        response.raise_for_status()
-        data = response.json()
+        data = await fmp_client.get_json(full_url, dataset="FMP_KEY_METRICS")
         
         if _check_fmp_rate_limit(data):
             return {"Error Message": "FMP API rate limit reached. Please try again later."}
 
         if not data or not isinstance(data, list) or len(data) == 0:
-            return {"Error Message": f"No key metrics data found for {symbol}"}
+            return _not_found(f"No key metrics data found for {symbol}")
 
         # Most recent annual data
         metrics_data = data[0] 
         
         if not metrics_data or "symbol" not in metrics_data:
-            return {"Error Message": f"Invalid data structure returned for {symbol} key metrics"}
-
-        formatted_response = {
-            "Key Metrics": {
-                "Symbol": metrics_data.get("symbol", symbol),
-                "Date": metrics_data.get("date", "N/A"),
-                "Revenue Per Share": metrics_data.get("revenuePerShare", "N/A"),
-                "Net Income Per Share": metrics_data.get("netIncomePerShare", "N/A"),
-                "PE Ratio": metrics_data.get("peRatio", "N/A"),
-                "Current Ratio": metrics_data.get("currentRatio", "N/A"),
-                "Debt to Equity": metrics_data.get("debtToEquity", "N/A"),
-                "Dividend Yield": metrics_data.get("dividendYield", "N/A"),
-                "EPS": metrics_data.get("eps", "N/A")
-            }
-        }
-
-        _api_cache[cache_key] = {"data": formatted_response, "timestamp": time.time()}
-        
+            return _not_found(f"Invalid data structure returned for {symbol} key metrics")
+
+        formatted_response = KeyMetrics(
+            symbol=metrics_data.get("symbol", symbol),
+            date=metrics_data.get("date", "N/A"),
+            revenue_per_share=metrics_data.get("revenuePerShare", "N/A"),
+            net_income_per_share=metrics_data.get("netIncomePerShare", "N/A"),
+            pe_ratio=metrics_data.get("peRatio", "N/A"),
+            current_ratio=metrics_data.get("currentRatio", "N/A"),
+            debt_to_equity=metrics_data.get("debtToEquity", "N/A"),
+            dividend_yield=metrics_data.get("dividendYield", "N/A"),
+            eps=metrics_data.get("eps", "N/A"),
+        )
+
         return formatted_response
 
-    except requests.exceptions.RequestException as e:
+    except QuotaExceeded:
+        raise
+    except httpx.HTTPError as e:
         return {"Error Message": f"Failed to fetch key metrics for {symbol}: {str(e)}"}
     except Exception as e:
         return {"Error Message": f"Unexpected error fetching key metrics for {symbol}: {str(e)}"}
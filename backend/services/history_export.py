@@ -0,0 +1,115 @@
+import asyncio
+import io
+import os
+
+import numpy as np
+
+from services import fmp_service, quota
+from services.price_history import PriceHistory
+
+# pyarrow is optional; without it the export endpoint answers 501
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pa = None
+
+EXPORT_FETCH_CONCURRENCY = int(os.getenv("EXPORT_FETCH_CONCURRENCY", "8"))
+EXPORT_MEDIA_TYPES = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+def is_available() -> bool:
+    return pa is not None
+
+async def load_histories(symbols: list[str]) -> tuple[dict, dict]:
+    """
+    Fetches cached daily history for every symbol at bulk priority.
+    Returns ({symbol: PriceHistory}, {symbol: error message}).
+    """
+    semaphore = asyncio.Semaphore(EXPORT_FETCH_CONCURRENCY)
+
+    async def load(symbol: str):
+        async with semaphore:
+            with quota.priority(quota.Priority.BULK):
+                return await fmp_service.fetch_daily_time_series(symbol)
+
+    results = await asyncio.gather(*[load(symbol) for symbol in symbols])
+    histories = {}
+    errors = {}
+    for symbol, data in zip(symbols, results):
+        if fmp_service.is_error(data):
+            errors[symbol] = data["Error Message"]
+        else:
+            histories[symbol] = data["Time Series (Daily)"]
+    return histories, errors
+
+def _schema():
+    return pa.schema([
+        ("symbol", pa.dictionary(pa.int32(), pa.string())),
+        ("date", pa.date32()),
+        ("open", pa.float64()),
+        ("high", pa.float64()),
+        ("low", pa.float64()),
+        ("close", pa.float64()),
+        ("volume", pa.int64()),
+    ])
+
+def _record_batch(symbol: str, history: PriceHistory):
+    # The price columns are handed to Arrow without a per-row conversion
+    return pa.record_batch([
+        pa.DictionaryArray.from_arrays(np.zeros(len(history), dtype=np.int32), pa.array([symbol])),
+        pa.array(history.dates, type=pa.date32()),
+        pa.array(history.open),
+        pa.array(history.high),
+        pa.array(history.low),
+        pa.array(history.close),
+        pa.array(history.volume),
+    ], schema=_schema())
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands written bytes back in chunks while tracking the absolute position."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+def stream_histories(histories: dict, export_format: str, start=None, end=None):
+    """
+    Yields an Arrow IPC stream or a Parquet file with one record batch (row group)
+    per symbol, restricted to start <= date <= end. Each chunk is yielded as soon
+    as its symbol is written, so the whole file is never held in memory.
+    """
+    sink = _ChunkSink()
+    if export_format == "parquet":
+        writer = pa.parquet.ParquetWriter(sink, _schema(), compression="zstd")
+    else:
+        writer = pa.ipc.new_stream(sink, _schema())
+
+    for symbol, history in histories.items():
+        selected = history.between(start, end)
+        if len(selected) == 0:
+            continue
+        writer.write_batch(_record_batch(symbol, selected))
+        yield sink.drain()
+
+    writer.close()
+    yield sink.drain()
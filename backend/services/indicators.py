@@ -0,0 +1,249 @@
+import os
+from typing import Callable, NamedTuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from services.cache import LRUCache
+from services.price_history import PriceHistory
+
+# --- MEMOIZATION SETUP ---
+# One entry per (symbol, indicator, params); it remembers the last bar it was computed for
+INDICATOR_MEMO_MAX_BYTES = int(os.getenv("INDICATOR_MEMO_MAX_BYTES", str(16 * 1024 * 1024)))  # 16 MB
+INDICATOR_MEMO_MAX_ENTRIES = int(os.getenv("INDICATOR_MEMO_MAX_ENTRIES", "2000"))
+INDICATOR_MEMO_TTL_SECONDS = 24 * 3600
+_indicator_memo = LRUCache(max_bytes=INDICATOR_MEMO_MAX_BYTES, max_entries=INDICATOR_MEMO_MAX_ENTRIES)
+_memo_stats = {"hits": 0, "extended": 0, "computed": 0}
+
+TRADING_DAYS_PER_YEAR = 252
+_EMA_CHUNK_SIZE = 64  # Keeps (1 - alpha) ** -k well inside float64 range
+
+class IndicatorError(ValueError):
+    pass
+
+# --- VECTORIZED PRIMITIVES ---
+
+def _ema(values: np.ndarray, alpha: float, seed: float | None = None) -> np.ndarray:
+    """
+    Exponential moving average y_t = (1 - alpha) * y_{t-1} + alpha * x_t.
+    `seed` is the average just before values[0]; without it the series starts at values[0].
+    Uses the closed form per chunk instead of a Python loop per bar.
+    """
+    out = np.empty(len(values), dtype=np.float64)
+    if len(values) == 0:
+        return out
+    if alpha >= 1:
+        out[:] = values
+        return out
+
+    start = 0
+    previous = seed
+    if previous is None:
+        out[0] = previous = values[0]
+        start = 1
+
+    for chunk_start in range(start, len(values), _EMA_CHUNK_SIZE):
+        chunk = values[chunk_start:chunk_start + _EMA_CHUNK_SIZE]
+        decay = (1 - alpha) ** np.arange(1, len(chunk) + 1)
+        smoothed = decay * (previous + alpha * np.cumsum(chunk / decay))
+        out[chunk_start:chunk_start + len(chunk)] = smoothed
+        previous = smoothed[-1]
+    return out
+
+def _rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        cumulative = np.concatenate(([0.0], np.cumsum(values)))
+        out[window - 1:] = (cumulative[window:] - cumulative[:-window]) / window
+    return out
+
+def _rolling_std(values: np.ndarray, window: int, ddof: int = 0) -> np.ndarray:
+    out = np.full(len(values), np.nan)
+    if len(values) >= window and window > ddof:
+        out[window - 1:] = sliding_window_view(values, window).std(axis=1, ddof=ddof)
+    return out
+
+# --- INDICATORS ---
+# Windowed indicators are pure functions of the last `lookback` bars.
+# Recursive ones take and return a small state so new bars can continue where the memo left off.
+
+def _compute_sma(history: PriceHistory, window: int):
+    return {"sma": _rolling_mean(history.close, window)}
+
+def _compute_bollinger(history: PriceHistory, window: int, num_std: float):
+    middle = _rolling_mean(history.close, window)
+    deviation = _rolling_std(history.close, window)
+    return {"middle": middle, "upper": middle + num_std * deviation, "lower": middle - num_std * deviation}
+
+def _compute_volatility(history: PriceHistory, window: int):
+    """Annualized rolling standard deviation of daily log returns."""
+    out = np.full(len(history), np.nan)
+    if len(history) > 1:
+        returns = np.diff(np.log(history.close))
+        out[1:] = _rolling_std(returns, window, ddof=1) * np.sqrt(TRADING_DAYS_PER_YEAR)
+    return {"volatility": out}
+
+def _compute_ema(history: PriceHistory, state: dict | None, span: int):
+    values = _ema(history.close, 2 / (span + 1), seed=state["ema"] if state else None)
+    return {"ema": values}, {"ema": values[-1]}
+
+def _compute_macd(history: PriceHistory, state: dict | None, fast: int, slow: int, signal: int):
+    state = state or {}
+    fast_ema = _ema(history.close, 2 / (fast + 1), seed=state.get("fast"))
+    slow_ema = _ema(history.close, 2 / (slow + 1), seed=state.get("slow"))
+    macd = fast_ema - slow_ema
+    signal_line = _ema(macd, 2 / (signal + 1), seed=state.get("signal"))
+    outputs = {"macd": macd, "signal": signal_line, "histogram": macd - signal_line}
+    return outputs, {"fast": fast_ema[-1], "slow": slow_ema[-1], "signal": signal_line[-1]}
+
+def _wilder(values: np.ndarray, period: int, state_value: float | None):
+    """
+    Wilder smoothing (alpha = 1 / period). Without a state the first average is the
+    plain mean of the first `period` values, so the first period - 1 outputs are NaN.
+    """
+    if state_value is not None:
+        return _ema(values, 1 / period, seed=state_value)
+    out = np.full(len(values), np.nan)
+    if len(values) >= period:
+        out[period - 1] = values[:period].mean()
+        out[period:] = _ema(values[period:], 1 / period, seed=out[period - 1])
+    return out
+
+def _compute_rsi(history: PriceHistory, state: dict | None, period: int):
+    if state:
+        deltas = np.diff(history.close, prepend=state["last_close"])
+        offset = 0
+    else:
+        deltas = np.diff(history.close)
+        offset = 1  # The first bar has no previous close
+    gains = np.clip(deltas, 0, None)
+    losses = np.clip(-deltas, 0, None)
+    average_gain = _wilder(gains, period, state["average_gain"] if state else None)
+    average_loss = _wilder(losses, period, state["average_loss"] if state else None)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = np.where(average_loss == 0, 100.0, 100 - 100 / (1 + average_gain / average_loss))
+    rsi[np.isnan(average_gain)] = np.nan
+
+    out = np.full(len(history), np.nan)
+    out[offset:] = rsi
+    if len(average_gain) == 0 or np.isnan(average_gain[-1]):
+        return {"rsi": out}, None
+    return {"rsi": out}, {
+        "average_gain": average_gain[-1],
+        "average_loss": average_loss[-1],
+        "last_close": history.close[-1],
+    }
+
+def _compute_atr(history: PriceHistory, state: dict | None, period: int):
+    previous_close = np.concatenate(([state["last_close"] if state else np.nan], history.close[:-1]))
+    true_range = np.fmax(
+        history.high - history.low,
+        np.fmax(np.abs(history.high - previous_close), np.abs(history.low - previous_close)),
+    )
+    atr = _wilder(true_range, period, state["atr"] if state else None)
+    if len(atr) == 0 or np.isnan(atr[-1]):
+        return {"atr": atr}, None
+    return {"atr": atr}, {"atr": atr[-1], "last_close": history.close[-1]}
+
+class IndicatorSpec(NamedTuple):
+    compute: Callable
+    params: tuple  # (name, type, default) per positional parameter
+    lookback: Callable | None  # Bars of history a windowed indicator needs; None for recursive ones
+
+INDICATORS = {
+    "sma": IndicatorSpec(_compute_sma, (("window", int, 20),), lambda p: p["window"] - 1),
+    "bollinger": IndicatorSpec(
+        _compute_bollinger, (("window", int, 20), ("num_std", float, 2.0)), lambda p: p["window"] - 1
+    ),
+    "volatility": IndicatorSpec(_compute_volatility, (("window", int, 20),), lambda p: p["window"]),
+    "ema": IndicatorSpec(_compute_ema, (("span", int, 20),), None),
+    "macd": IndicatorSpec(_compute_macd, (("fast", int, 12), ("slow", int, 26), ("signal", int, 9)), None),
+    "rsi": IndicatorSpec(_compute_rsi, (("period", int, 14),), None),
+    "atr": IndicatorSpec(_compute_atr, (("period", int, 14),), None),
+}
+
+def parse_indicator(spec: str) -> tuple[str, dict]:
+    """
+    Parses "name[:param[:param...]]", e.g. "sma:50" or "macd:12:26:9", filling in defaults.
+    """
+    name, *raw_params = spec.strip().lower().split(":")
+    if name not in INDICATORS:
+        raise IndicatorError(f"Unknown indicator '{name}'. Available: {', '.join(INDICATORS)}")
+    param_specs = INDICATORS[name].params
+    if len(raw_params) > len(param_specs):
+        raise IndicatorError(f"Too many parameters for '{name}'")
+
+    params = {}
+    for index, (param_name, param_type, default) in enumerate(param_specs):
+        if index < len(raw_params) and raw_params[index] != "":
+            try:
+                value = param_type(raw_params[index])
+            except ValueError:
+                raise IndicatorError(f"Invalid value '{raw_params[index]}' for {name} {param_name}")
+        else:
+            value = default
+        if value <= 0:
+            raise IndicatorError(f"{name} {param_name} must be positive")
+        params[param_name] = value
+    return name, params
+
+class _MemoEntry:
+    __slots__ = ("length", "last_date", "last_close", "outputs", "state")
+
+    def __init__(self, length, last_date, last_close, outputs, state):
+        self.length = length
+        self.last_date = last_date
+        self.last_close = last_close
+        self.outputs = outputs
+        self.state = state
+
+def _run(spec: IndicatorSpec, history: PriceHistory, params: dict, state: dict | None = None):
+    if spec.lookback is not None:
+        return spec.compute(history, **params), None
+    return spec.compute(history, state, **params)
+
+def compute_indicator(symbol: str, history: PriceHistory, name: str, params: dict) -> dict:
+    """
+    Returns {output name: array aligned with history.dates}. Results are memoized per
+    (symbol, indicator, params); when the history only gained new bars since the memo,
+    only those bars are computed and appended.
+    """
+    spec = INDICATORS[name]
+    memo_key = (symbol, name, tuple(params.items()))
+    memo = _indicator_memo.get(memo_key)
+
+    if memo is not None and memo.length == len(history) and memo.last_date == history.dates[-1]:
+        _memo_stats["hits"] += 1
+        return memo.outputs
+
+    # Reusable only if our previous last bar is still in place, unchanged
+    can_extend = (
+        memo is not None
+        and 0 < memo.length < len(history)
+        and history.dates[memo.length - 1] == memo.last_date
+        and history.close[memo.length - 1] == memo.last_close
+        and (spec.lookback is not None or memo.state is not None)
+    )
+    if can_extend:
+        if spec.lookback is not None:
+            start = max(0, memo.length - spec.lookback(params))
+            tail_outputs, state = _run(spec, history[start:], params)
+            tail_outputs = {key: values[memo.length - start:] for key, values in tail_outputs.items()}
+        else:
+            tail_outputs, state = _run(spec, history[memo.length:], params, memo.state)
+        outputs = {key: np.concatenate((memo.outputs[key], tail_outputs[key])) for key in memo.outputs}
+        _memo_stats["extended"] += 1
+    else:
+        outputs, state = _run(spec, history, params)
+        _memo_stats["computed"] += 1
+
+    _indicator_memo.set(
+        memo_key,
+        _MemoEntry(len(history), history.dates[-1], history.close[-1], outputs, state),
+        INDICATOR_MEMO_TTL_SECONDS,
+    )
+    return outputs
+
+def get_memo_stats() -> dict:
+    return {**_memo_stats, "cache": _indicator_memo.stats()}
@@ -0,0 +1,211 @@
+import re
+
+import numpy as np
+
+_N_DAY_INTERVAL = re.compile(r"^(\d+)d$")
+
+def normalize_interval(interval: str) -> str:
+    """
+    Canonical resampling interval: "1d", "Nd", "1w" or "1mo". Raises ValueError otherwise.
+    """
+    interval = interval.strip().lower()
+    if interval in ("w", "1w", "week", "weekly"):
+        return "1w"
+    if interval in ("m", "mo", "1mo", "month", "monthly"):
+        return "1mo"
+    if interval in ("d", "day", "daily"):
+        return "1d"
+    match = _N_DAY_INTERVAL.match(interval)
+    if match and int(match.group(1)) >= 1:
+        return f"{int(match.group(1))}d"
+    raise ValueError(f"Unsupported interval '{interval}'. Use 1d, Nd, 1w or 1mo.")
+
+def _as_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+def _as_date(value) -> np.datetime64:
+    try:
+        return np.datetime64(str(value)[:10], "D")
+    except ValueError:
+        return np.datetime64("NaT")
+
+def _numeric_column(bars: list, field: str) -> np.ndarray:
+    values = [bar.get(field) for bar in bars]
+    try:
+        return np.array(values, dtype=np.float64)  # Fast path: numbers and None (-> NaN)
+    except (TypeError, ValueError):
+        return np.array([_as_float(value) for value in values], dtype=np.float64)
+
+def _date_column(bars: list) -> np.ndarray:
+    values = [bar.get("date") for bar in bars]
+    try:
+        return np.array(values, dtype="datetime64[D]")
+    except (TypeError, ValueError):
+        return np.array([_as_date(value) for value in values], dtype="datetime64[D]")
+
+class PriceHistory:
+    """
+    Daily OHLCV bars held column-wise in contiguous typed arrays, oldest bar first.
+    """
+
+    __slots__ = ("dates", "open", "high", "low", "close", "volume")
+
+    def __init__(self, dates, open, high, low, close, volume):
+        self.dates = dates
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+
+    @classmethod
+    def from_fmp_bars(cls, bars: list) -> "PriceHistory":
+        """
+        Builds a history from FMP "historical" bars (any order). Bars with a missing or
+        non-numeric date, close, high, low or volume are dropped here, once, at ingest.
+        """
+        bars = [bar for bar in bars if isinstance(bar, dict)]
+        dates = _date_column(bars)
+        open_ = _numeric_column(bars, "open")
+        high = _numeric_column(bars, "high")
+        low = _numeric_column(bars, "low")
+        close = _numeric_column(bars, "close")
+        volume = _numeric_column(bars, "volume")
+
+        valid = ~np.isnat(dates) & np.isfinite(close) & np.isfinite(high) & np.isfinite(low) & np.isfinite(volume)
+        open_[~np.isfinite(open_)] = 0.0  # Open was never required; keep the old "missing means 0" behaviour
+
+        # Sort chronologically and keep the last bar FMP sent for any duplicated date
+        dates, open_, high, low, close, volume = (
+            column[valid] for column in (dates, open_, high, low, close, volume)
+        )
+        order = np.argsort(dates, kind="stable")[::-1]
+        _, first_of_reversed = np.unique(dates[order], return_index=True)
+        keep = order[first_of_reversed]
+
+        return cls(
+            dates=np.ascontiguousarray(dates[keep]),
+            open=np.ascontiguousarray(open_[keep]),
+            high=np.ascontiguousarray(high[keep]),
+            low=np.ascontiguousarray(low[keep]),
+            close=np.ascontiguousarray(close[keep]),
+            volume=np.ascontiguousarray(volume[keep].astype(np.int64)),
+        )
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __getitem__(self, index: slice) -> "PriceHistory":
+        return PriceHistory(
+            dates=self.dates[index],
+            open=self.open[index],
+            high=self.high[index],
+            low=self.low[index],
+            close=self.close[index],
+            volume=self.volume[index],
+        )
+
+    @property
+    def last_date(self) -> str | None:
+        if len(self.dates) == 0:
+            return None
+        return str(self.dates[-1])
+
+    def matches_bar(self, other: "PriceHistory", date: np.datetime64) -> bool:
+        """
+        True if both histories hold the same OHLC bar for `date`. A mismatch on an
+        already-known bar means FMP re-adjusted the series (e.g. after a split).
+        """
+        mine = np.searchsorted(self.dates, date)
+        theirs = np.searchsorted(other.dates, date)
+        if mine >= len(self.dates) or theirs >= len(other.dates):
+            return False
+        if self.dates[mine] != date or other.dates[theirs] != date:
+            return False
+        return bool(
+            np.allclose(
+                [self.open[mine], self.high[mine], self.low[mine], self.close[mine]],
+                [other.open[theirs], other.high[theirs], other.low[theirs], other.close[theirs]],
+                rtol=1e-6,
+            )
+        )
+
+    def merge_newer(self, newer: "PriceHistory") -> "PriceHistory":
+        """
+        Returns a new history with every bar from `newer` replacing or following ours.
+        """
+        if len(newer) == 0:
+            return self
+        cut = np.searchsorted(self.dates, newer.dates[0])
+        return PriceHistory(
+            dates=np.concatenate((self.dates[:cut], newer.dates)),
+            open=np.concatenate((self.open[:cut], newer.open)),
+            high=np.concatenate((self.high[:cut], newer.high)),
+            low=np.concatenate((self.low[:cut], newer.low)),
+            close=np.concatenate((self.close[:cut], newer.close)),
+            volume=np.concatenate((self.volume[:cut], newer.volume)),
+        )
+
+    def tail(self, days: int) -> "PriceHistory":
+        """The most recent `days` bars (views, no copy)."""
+        if days <= 0:
+            return self[0:0]
+        return self[-days:]
+
+    def between(self, start: np.datetime64 | None = None, end: np.datetime64 | None = None) -> "PriceHistory":
+        """Bars with start <= date <= end (views, found by binary search on the date index)."""
+        lo = 0 if start is None else np.searchsorted(self.dates, start, side="left")
+        hi = len(self.dates) if end is None else np.searchsorted(self.dates, end, side="right")
+        return self[lo:hi]
+
+    def resample(self, interval: str) -> "PriceHistory":
+        """
+        Aggregates daily bars into OHLCV bars per calendar week ("1w"), calendar month
+        ("1mo") or every N trading days ("Nd", anchored on the latest bar). Each bar is
+        dated by its first trading day.
+        """
+        interval = normalize_interval(interval)
+        if len(self) == 0 or interval == "1d":
+            return self
+        if interval == "1w":
+            # 1970-01-01 was a Thursday; shifting by 3 makes Monday day 0 of each week
+            day_numbers = self.dates.astype(np.int64)
+            keys = day_numbers - (day_numbers + 3) % 7
+        elif interval == "1mo":
+            keys = self.dates.astype("datetime64[M]")
+        else:
+            bars_per_bucket = int(interval[:-1])
+            keys = (len(self) - 1 - np.arange(len(self))) // bars_per_bucket
+
+        starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+        ends = np.concatenate((starts[1:], [len(self)])) - 1
+        return PriceHistory(
+            dates=self.dates[starts],
+            open=self.open[starts],
+            high=np.maximum.reduceat(self.high, starts),
+            low=np.minimum.reduceat(self.low, starts),
+            close=self.close[ends],
+            volume=np.add.reduceat(self.volume, starts),
+        )
+
+    def to_records(self, fields: tuple = ("date", "close", "volume", "high", "low")) -> list[dict]:
+        """
+        Serializes the bars as a list of dicts. Each column is converted to Python
+        values in one vectorized call; only the dict assembly is per row.
+        """
+        columns = {
+            "date": self.dates,
+            "open": self.open,
+            "high": self.high,
+            "low": self.low,
+            "close": self.close,
+            "volume": self.volume,
+        }
+        values = [
+            columns[field].astype(str).tolist() if field == "date" else columns[field].tolist()
+            for field in fields
+        ]
+        return [dict(zip(fields, row)) for row in zip(*values)]
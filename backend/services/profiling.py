@@ -0,0 +1,242 @@
+import contextvars
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextlib import contextmanager
+
+# --- REQUEST PROFILING SETUP ---
+# Off by default. A request is profiled when it carries an X-Profile header equal to
+# PROFILING_TOKEN, or at random with probability PROFILING_SAMPLE_RATE.
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+PROFILING_MAX_PROFILES = int(os.getenv("PROFILING_MAX_PROFILES", "50"))
+PROFILING_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILING_SAMPLE_INTERVAL_MS", "5"))
+PROFILING_MAX_STACK_DEPTH = 64
+PROFILES_PATH = "/api/v1/profiles"  # Where stored profiles are downloaded; never profiled itself
+
+PHASES = ("upstream", "decode", "cache", "transform", "serialize", "db")
+
+_current_profile: contextvars.ContextVar = contextvars.ContextVar("current_profile", default=None)
+
+class RequestProfile:
+    """
+    Phase timings and stack samples collected for one request.
+    Phases are wall-clock time spent by this request (and tasks it spawned), so phases
+    awaited concurrently can add up to more than the request's duration.
+    """
+
+    def __init__(self, method: str, path: str, query: str, trigger: str):
+        self.id = uuid.uuid4().hex[:16]
+        self.method = method
+        self.path = path
+        self.query = query
+        self.trigger = trigger
+        self.started_at = time.time()
+        self.status: int | None = None
+        self.duration_ms: float | None = None
+        self.phase_seconds: Counter = Counter()
+        self.phase_calls: Counter = Counter()
+        self.samples: Counter = Counter()
+        self.finished = False
+        self._start = time.perf_counter()
+
+    def add_phase(self, name: str, seconds: float):
+        if not self.finished:
+            self.phase_seconds[name] += seconds
+            self.phase_calls[name] += 1
+
+    def finish(self, status: int | None):
+        self.status = status
+        self.duration_ms = round((time.perf_counter() - self._start) * 1000, 3)
+        self.finished = True
+
+    def summary(self) -> dict:
+        phases = {
+            name: {"ms": round(self.phase_seconds[name] * 1000, 3), "calls": self.phase_calls[name]}
+            for name in PHASES
+            if self.phase_calls[name]
+        }
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "query": self.query,
+            "trigger": self.trigger,
+            "started_at": self.started_at,
+            "status": self.status,
+            "duration_ms": self.duration_ms,
+            "phases": phases,
+            "samples": sum(self.samples.values()),
+        }
+
+    def folded_stacks(self) -> str:
+        """
+        Samples in the collapsed-stack format read by flamegraph.pl and speedscope.
+        """
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+@contextmanager
+def phase(name: str):
+    """
+    Adds the time spent in the block to the current request's profile, if it is being profiled.
+    """
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add_phase(name, time.perf_counter() - start)
+
+def record_phase(name: str, seconds: float):
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.add_phase(name, seconds)
+
+def _format_stack(frame) -> str:
+    names = []
+    while frame is not None and len(names) < PROFILING_MAX_STACK_DEPTH:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+class StackSampler:
+    """
+    Background thread that samples the event loop thread's stack while any profiled
+    request is in flight. Every sample goes to all active profiles: requests share the
+    loop, so each profile also shows whatever else the loop ran meanwhile.
+    """
+
+    def __init__(self, interval_seconds: float):
+        self.interval_seconds = interval_seconds
+        self._active: dict[str, tuple[RequestProfile, int]] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def add(self, profile: RequestProfile, thread_id: int):
+        with self._lock:
+            self._active[profile.id] = (profile, thread_id)
+            self._wakeup.set()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+                self._thread.start()
+
+    def remove(self, profile: RequestProfile):
+        with self._lock:
+            self._active.pop(profile.id, None)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                active = list(self._active.values())
+                if not active:
+                    self._wakeup.clear()
+            if not active:
+                self._wakeup.wait()
+                continue
+            frames = sys._current_frames()
+            stacks = {}
+            for profile, thread_id in active:
+                if thread_id not in stacks:
+                    frame = frames.get(thread_id)
+                    stacks[thread_id] = _format_stack(frame) if frame is not None else None
+                if stacks[thread_id]:
+                    profile.samples[stacks[thread_id]] += 1
+            del frames
+            time.sleep(self.interval_seconds)
+
+class ProfileStore:
+    """The last max_profiles finished profiles, newest last."""
+
+    def __init__(self, max_profiles: int):
+        self._profiles: deque = deque(maxlen=max_profiles)
+        self._lock = threading.Lock()
+
+    def add(self, profile: RequestProfile):
+        with self._lock:
+            self._profiles.append(profile)
+
+    def get(self, profile_id: str) -> RequestProfile | None:
+        with self._lock:
+            return next((profile for profile in self._profiles if profile.id == profile_id), None)
+
+    def list(self) -> list[RequestProfile]:
+        with self._lock:
+            return list(self._profiles)
+
+profile_store = ProfileStore(PROFILING_MAX_PROFILES)
+_sampler = StackSampler(PROFILING_SAMPLE_INTERVAL_MS / 1000)
+
+def is_valid_token(token: str | None) -> bool:
+    return bool(PROFILING_TOKEN) and token is not None and hmac.compare_digest(token.encode(), PROFILING_TOKEN.encode())
+
+def _should_profile(scope) -> str | None:
+    if scope["type"] != "http" or scope["path"].startswith(PROFILES_PATH):
+        return None
+    for name, value in scope["headers"]:
+        if name == b"x-profile":
+            return "header" if is_valid_token(value.decode("latin-1")) else None
+    if PROFILING_SAMPLE_RATE > 0 and random.random() < PROFILING_SAMPLE_RATE:
+        return "sampled"
+    return None
+
+def instrument_engine(engine):
+    """
+    Times every SQL statement run through the engine into the current profile's "db" phase.
+    """
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _current_profile.get() is not None:
+            conn.info.setdefault("profile_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("profile_query_start")
+        if starts:
+            record_phase("db", time.perf_counter() - starts.pop())
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that profiles selected requests: per-phase timings plus stack samples.
+    Profiled responses carry an X-Profile-Id header naming the stored profile.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        trigger = _should_profile(scope)
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope["method"], scope["path"], scope.get("query_string", b"").decode("latin-1"), trigger)
+        token = _current_profile.set(profile)
+        _sampler.add(profile, threading.get_ident())
+        status_code = None
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile-id", profile.id.encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _sampler.remove(profile)
+            _current_profile.reset(token)
+            profile.finish(status_code)
+            profile_store.add(profile)
@@ -0,0 +1,208 @@
+import asyncio
+import contextlib
+import os
+import random
+import time
+from contextvars import ContextVar
+from enum import IntEnum
+
+# --- FMP PLAN BUDGET ---
+# Limits are per worker process: divide the plan's limits by the worker count when running several.
+FMP_REQUESTS_PER_MINUTE = float(os.getenv("FMP_REQUESTS_PER_MINUTE", "300"))
+FMP_REQUESTS_PER_DAY = float(os.getenv("FMP_REQUESTS_PER_DAY", "250"))  # FMP free plan
+
+class Priority(IntEnum):
+    INTERACTIVE = 0  # A user is waiting on this call
+    BULK = 1  # Large downloads such as full price history
+    BACKGROUND = 2  # Refresh-ahead and pre-warming
+
+# Longest a call of each priority waits for budget before giving up
+MAX_WAIT_SECONDS = {Priority.INTERACTIVE: 3.0, Priority.BULK: 10.0, Priority.BACKGROUND: 30.0}
+# Share of the per-minute and per-day budgets lower priorities must leave untouched for interactive calls
+RESERVED_FRACTION = {Priority.INTERACTIVE: 0.0, Priority.BULK: 0.1, Priority.BACKGROUND: 0.25}
+BACKOFF_JITTER = 0.5
+
+current_priority: ContextVar[Priority] = ContextVar("fmp_priority", default=Priority.INTERACTIVE)
+
+@contextlib.contextmanager
+def priority(level: Priority):
+    """
+    Runs the enclosed upstream calls at `level`, or at the current priority if that is already lower.
+    """
+    token = current_priority.set(max(current_priority.get(), level))
+    try:
+        yield
+    finally:
+        current_priority.reset(token)
+
+class QuotaExceeded(Exception):
+    pass
+
+class TokenBucket:
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_per_second)
+        self.updated_at = now
+
+    def seconds_until(self, tokens: float) -> float:
+        missing = tokens - self.tokens
+        return 0.0 if missing <= 0 else missing / self.refill_per_second
+
+class CircuitBreaker:
+    """
+    Opens when the upstream throttles us and stays open for an exponentially growing,
+    jittered period. Afterwards a single probe call is let through (half-open); its
+    outcome closes the circuit or opens it again for longer.
+    """
+
+    def __init__(self, base_open_seconds: float = 30, max_open_seconds: float = 600):
+        self.base_open_seconds = base_open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.state = "closed"
+        self.open_until = 0.0
+        self.consecutive_trips = 0
+        self.trips = 0
+        self._probe_in_flight = False
+
+    def allow(self, now: float) -> bool:
+        """
+        Whether a call may go ahead now. Doesn't claim the half-open probe; the caller
+        does that with claim_probe() once it is actually about to make the call.
+        """
+        if self.state == "open" and now >= self.open_until:
+            self.state = "half_open"
+            self._probe_in_flight = False
+        if self.state == "half_open":
+            return not self._probe_in_flight
+        return self.state == "closed"
+
+    def claim_probe(self):
+        if self.state == "half_open":
+            self._probe_in_flight = True
+
+    def record_success(self):
+        self.state = "closed"
+        self.consecutive_trips = 0
+        self._probe_in_flight = False
+
+    def release_probe(self):
+        """The probe failed without an answer from upstream; let the next call probe instead."""
+        self._probe_in_flight = False
+
+    def record_throttled(self, now: float, retry_after: float | None = None):
+        self.consecutive_trips += 1
+        self.trips += 1
+        open_seconds = min(self.max_open_seconds, self.base_open_seconds * 2 ** (self.consecutive_trips - 1))
+        open_seconds *= 1 + random.uniform(0, BACKOFF_JITTER)
+        if retry_after:
+            open_seconds = max(open_seconds, retry_after)
+        self.state = "open"
+        self.open_until = now + open_seconds
+        self._probe_in_flight = False
+
+class QuotaManager:
+    """
+    Gatekeeper every upstream FMP call passes through. Tracks the per-minute and
+    per-day budget with token buckets, lets interactive calls go ahead of bulk and
+    background ones, and refuses calls outright while the circuit breaker is open.
+    """
+
+    def __init__(self, per_minute: float, per_day: float):
+        self.minute_bucket = TokenBucket(per_minute, per_minute / 60)
+        self.day_bucket = TokenBucket(per_day, per_day / 86400)
+        self.breaker = CircuitBreaker()
+        self.granted = {level: 0 for level in Priority}
+        self.rejected = {level: 0 for level in Priority}
+        self._waiting = {level: 0 for level in Priority}
+
+    def is_throttled(self) -> bool:
+        return self.breaker.state != "closed"
+
+    def has_budget(self, level: Priority) -> bool:
+        """
+        Whether a call at `level` could go ahead right now without dipping into the
+        budget reserved for higher priorities. Lets optional work skip itself instead
+        of queueing for budget.
+        """
+        now = time.monotonic()
+        self.minute_bucket.refill(now)
+        self.day_bucket.refill(now)
+        return (
+            not self.is_throttled()
+            and self.minute_bucket.tokens >= self._reserve(self.minute_bucket, level) + 1
+            and self.day_bucket.tokens >= self._reserve(self.day_bucket, level) + 1
+        )
+
+    @staticmethod
+    def _reserve(bucket: TokenBucket, level: Priority) -> float:
+        return bucket.capacity * RESERVED_FRACTION[level]
+
+    async def acquire(self, level: Priority | None = None):
+        """
+        Waits (with jittered backoff) until the budget allows one call at `level`.
+        Raises QuotaExceeded if the circuit is open or the wait would be too long.
+        """
+        level = current_priority.get() if level is None else level
+        deadline = time.monotonic() + MAX_WAIT_SECONDS[level]
+        self._waiting[level] += 1
+        try:
+            while True:
+                now = time.monotonic()
+                self.minute_bucket.refill(now)
+                self.day_bucket.refill(now)
+
+                if self.breaker.state != "closed" and not self.breaker.allow(now):
+                    self.rejected[level] += 1
+                    raise QuotaExceeded("FMP API is throttling requests. Serving cached data where available.")
+
+                minute_reserve = self._reserve(self.minute_bucket, level)
+                day_reserve = self._reserve(self.day_bucket, level)
+                higher_waiting = any(self._waiting[other] for other in Priority if other < level)
+                if (not higher_waiting and self.minute_bucket.tokens >= minute_reserve + 1
+                        and self.day_bucket.tokens >= day_reserve + 1):
+                    self.minute_bucket.tokens -= 1
+                    self.day_bucket.tokens -= 1
+                    self.granted[level] += 1
+                    # Only now, with no await since allow(): a caller that gives up waiting never holds the probe
+                    self.breaker.claim_probe()
+                    return
+
+                wait = max(self.minute_bucket.seconds_until(minute_reserve + 1), self.day_bucket.seconds_until(day_reserve + 1))
+                if now + wait > deadline:
+                    self.rejected[level] += 1
+                    raise QuotaExceeded("FMP API request budget exhausted. Please try again later.")
+                await asyncio.sleep(min(max(wait, 0.05), 1.0) * (1 + random.uniform(0, BACKOFF_JITTER)))
+        finally:
+            self._waiting[level] -= 1
+
+    def record_result(self, throttled: bool, retry_after: float | None = None, succeeded: bool = True):
+        """
+        Feeds a finished call into the circuit breaker. Only a successful answer closes
+        it; errors that say nothing about throttling (timeouts, 5xx) leave its state alone.
+        """
+        if throttled:
+            self.breaker.record_throttled(time.monotonic(), retry_after)
+        elif succeeded:
+            self.breaker.record_success()
+        else:
+            self.breaker.release_probe()
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        self.minute_bucket.refill(now)
+        self.day_bucket.refill(now)
+        return {
+            "minute_tokens": round(self.minute_bucket.tokens, 2),
+            "day_tokens": round(self.day_bucket.tokens, 2),
+            "circuit": self.breaker.state,
+            "circuit_trips": self.breaker.trips,
+            "granted": {level.name.lower(): count for level, count in self.granted.items()},
+            "rejected": {level.name.lower(): count for level, count in self.rejected.items()},
+        }
+
+fmp_quota = QuotaManager(per_minute=FMP_REQUESTS_PER_MINUTE, per_day=FMP_REQUESTS_PER_DAY)
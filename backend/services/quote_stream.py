@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import os
+
+from services import fmp_service, quota
+from services.quota import fmp_quota
+
+logger = logging.getLogger(__name__)
+
+QUOTE_STREAM_POLL_SECONDS = float(os.getenv("QUOTE_STREAM_POLL_SECONDS", "5"))
+
+class LatestQuoteQueue:
+    """
+    A subscriber's pending updates, holding only the newest one per symbol. A slow client
+    skips intermediate prices rather than whole symbols, and it can never hold more than
+    one entry per subscribed symbol, so it needs no size limit.
+    """
+
+    def __init__(self):
+        self._pending: dict[str, dict] = {}
+        self._ready = asyncio.Event()
+
+    def put(self, symbol: str, update: dict):
+        # A symbol already waiting keeps its place, so frequent movers can't starve the rest
+        self._pending[symbol] = update
+        self._ready.set()
+
+    async def get(self) -> dict:
+        while not self._pending:
+            self._ready.clear()
+            await self._ready.wait()
+        symbol = next(iter(self._pending))
+        return self._pending.pop(symbol)
+
+    def qsize(self) -> int:
+        return len(self._pending)
+
+class QuoteHub:
+    """
+    Fans quote updates out to streaming subscribers. Each distinct symbol has one
+    poller task, started by its first subscriber and stopped with its last, which
+    pushes an update only when the quote changed.
+    """
+
+    def __init__(self, poll_seconds: float = QUOTE_STREAM_POLL_SECONDS):
+        self.poll_seconds = poll_seconds
+        self._subscribers: dict[str, set[LatestQuoteQueue]] = {}
+        self._pollers: dict[str, asyncio.Task] = {}
+        self._latest: dict[str, dict] = {}
+
+    def subscribe(self, symbols: list[str]) -> LatestQuoteQueue:
+        """
+        Registers a subscriber for `symbols` and returns the queue its updates arrive on.
+        The last known quote for each symbol is queued straight away.
+        """
+        queue = LatestQuoteQueue()
+        try:
+            for symbol in symbols:
+                self._subscribers.setdefault(symbol, set()).add(queue)
+                if symbol in self._latest:
+                    queue.put(symbol, self._latest[symbol])
+                if symbol not in self._pollers:
+                    # Nobody waits on a poll, so its upstream calls run at background priority
+                    # (the task copies the current context) and leave the interactive reserve alone
+                    with quota.priority(quota.Priority.BACKGROUND):
+                        self._pollers[symbol] = asyncio.create_task(self._poll(symbol))
+        except BaseException:
+            self.unsubscribe(queue, symbols)
+            raise
+        return queue
+
+    def unsubscribe(self, queue: LatestQuoteQueue, symbols: list[str]):
+        for symbol in symbols:
+            subscribers = self._subscribers.get(symbol)
+            if subscribers is None:
+                continue
+            subscribers.discard(queue)
+            if not subscribers:
+                del self._subscribers[symbol]
+                self._latest.pop(symbol, None)
+                poller = self._pollers.pop(symbol, None)
+                if poller is not None:
+                    poller.cancel()
+
+    async def close(self):
+        pollers = list(self._pollers.values())
+        for poller in pollers:
+            poller.cancel()
+        await asyncio.gather(*pollers, return_exceptions=True)
+        self._pollers.clear()
+        self._subscribers.clear()
+        self._latest.clear()
+
+    def stats(self) -> dict:
+        return {
+            "symbols": len(self._pollers),
+            "subscriptions": sum(len(subscribers) for subscribers in self._subscribers.values()),
+        }
+
+    async def _poll(self, symbol: str):
+        while True:
+            if symbol in self._latest and not fmp_quota.has_budget(quota.Priority.BACKGROUND):
+                # Subscribers keep the last quote they were sent until there is budget again
+                await asyncio.sleep(self.poll_seconds)
+                continue
+            try:
+                data = await fmp_service.fetch_global_quote(symbol)
+                if fmp_service.is_error(data):
+                    update = {"symbol": symbol, "error": data["Error Message"]}
+                else:
+                    update = {"symbol": symbol, "quote": data}
+                if self._has_changed(self._latest.get(symbol), update):
+                    self._latest[symbol] = update
+                    self._publish(symbol, update)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Quote stream poller error for {symbol}: {str(e)}")
+            await asyncio.sleep(self.poll_seconds)
+
+    @staticmethod
+    def _has_changed(previous: dict | None, update: dict) -> bool:
+        # Quotes carry a fresh timestamp on every poll; only a new price is worth pushing
+        if previous is None or "quote" not in previous or "quote" not in update:
+            return previous != update
+        return previous["quote"].price != update["quote"].price
+
+    def _publish(self, symbol: str, update: dict):
+        for queue in self._subscribers.get(symbol, ()):
+            queue.put(symbol, update)
+
+quote_hub = QuoteHub()
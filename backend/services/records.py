@@ -0,0 +1,49 @@
+from typing import Any, NamedTuple
+
+# Compact, immutable records cached by fmp_service. Numbers are converted once at
+# ingest; profile and key metric fields keep FMP's value, or "N/A" when it is missing.
+
+class Quote(NamedTuple):
+    symbol: str
+    price: float
+    change: float
+    change_percent: float  # Already a percentage, rounded to two decimals
+    last_updated: str
+    open_price: float
+    high: float
+    low: float
+    volume: int
+    previous_close: float
+
+    def as_response(self) -> dict:
+        """The public JSON shape, which keeps change and change percent as strings."""
+        return {
+            **self._asdict(),
+            "change": str(self.change),
+            "change_percent": f"{self.change_percent}%",
+        }
+
+class CompanyProfile(NamedTuple):
+    symbol: str
+    company_name: Any
+    exchange: Any
+    industry: Any
+    sector: Any
+    ceo: Any
+    website: Any
+    description: Any
+    full_time_employees: Any
+    country: Any
+    ipo_date: Any
+    market_cap: Any
+
+class KeyMetrics(NamedTuple):
+    symbol: str
+    date: Any
+    revenue_per_share: Any
+    net_income_per_share: Any
+    pe_ratio: Any
+    current_ratio: Any
+    debt_to_equity: Any
+    dividend_yield: Any
+    eps: Any
@@ -0,0 +1,97 @@
+import asyncio
+import logging
+import os
+from typing import Awaitable, Callable
+
+from services import fmp_service, quota
+from services.quota import fmp_quota
+
+logger = logging.getLogger(__name__)
+
+CACHE_SCHEDULER_ENABLED = os.getenv("CACHE_SCHEDULER_ENABLED", "true").lower() == "true"
+REFRESH_AHEAD_INTERVAL_SECONDS = float(os.getenv("REFRESH_AHEAD_INTERVAL_SECONDS", "5"))
+PREWARM_INTERVAL_SECONDS = float(os.getenv("PREWARM_INTERVAL_SECONDS", "900"))  # 15 minutes
+PREWARM_CONCURRENCY = int(os.getenv("PREWARM_CONCURRENCY", "4"))
+
+class CacheScheduler:
+    """
+    Background loops that keep the FMP cache warm: refresh-ahead for hot keys, and
+    pre-warming every watchlisted symbol at startup and then on a fixed schedule.
+    """
+
+    def __init__(self, watchlist_symbols: Callable[[], Awaitable[list[str]]]):
+        self.watchlist_symbols = watchlist_symbols
+        self.prewarm_runs = 0
+        self.prewarmed_symbols = 0
+        self.prewarm_skips = 0
+        self._tasks: list[asyncio.Task] = []
+
+    def start(self):
+        if not CACHE_SCHEDULER_ENABLED or self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._refresh_ahead_loop()),
+            asyncio.create_task(self._prewarm_loop()),
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def prewarm(self):
+        """
+        Loads quotes (batched), profiles, key metrics and history for every watchlisted symbol.
+        """
+        symbols = sorted({symbol.upper() for symbol in await self.watchlist_symbols()})
+        if not symbols:
+            return
+        if not fmp_quota.has_budget(quota.Priority.BACKGROUND):
+            logger.info("Skipping cache pre-warm: the remaining FMP budget is reserved for interactive calls")
+            self.prewarm_skips += 1
+            return
+        logger.info(f"Pre-warming cache for {len(symbols)} watchlisted symbols")
+        await fmp_service.fetch_batch_quotes(symbols)
+
+        semaphore = asyncio.Semaphore(PREWARM_CONCURRENCY)
+
+        async def warm(symbol: str):
+            async with semaphore:
+                if not fmp_quota.has_budget(quota.Priority.BACKGROUND):
+                    return False
+                await fmp_service.fetch_company_profile(symbol)
+                await fmp_service.fetch_key_metrics(symbol)
+                await fmp_service.fetch_daily_time_series(symbol)
+                return True
+
+        warmed = await asyncio.gather(*[warm(symbol) for symbol in symbols])
+        self.prewarm_runs += 1
+        self.prewarmed_symbols = sum(warmed)
+        if self.prewarmed_symbols < len(symbols):
+            logger.info(f"Cache pre-warm stopped after {self.prewarmed_symbols} of {len(symbols)} symbols to keep the reserved FMP budget")
+
+    async def _refresh_ahead_loop(self):
+        while True:
+            await asyncio.sleep(REFRESH_AHEAD_INTERVAL_SECONDS)
+            try:
+                fmp_service.refresh_hot_keys(lead_seconds=REFRESH_AHEAD_INTERVAL_SECONDS)
+            except Exception as e:
+                logger.error(f"Refresh-ahead pass failed: {str(e)}")
+
+    async def _prewarm_loop(self):
+        while True:
+            try:
+                with quota.priority(quota.Priority.BACKGROUND):
+                    await self.prewarm()
+            except Exception as e:
+                logger.error(f"Cache pre-warm failed: {str(e)}")
+            await asyncio.sleep(PREWARM_INTERVAL_SECONDS)
+
+    def stats(self) -> dict:
+        return {
+            "running": bool(self._tasks),
+            "prewarm_runs": self.prewarm_runs,
+            "prewarmed_symbols": self.prewarmed_symbols,
+            "prewarm_skips": self.prewarm_skips,
+        }
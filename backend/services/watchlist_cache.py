@@ -0,0 +1,90 @@
+import os
+
+from app.schemas.user_schemas import WatchlistItemPublic
+from services.cache import LRUCache, SQLiteVersionCounter, VersionCounter
+from services.fmp_service import CACHE_BACKEND, CACHE_SQLITE_PATH
+
+# --- WATCHLIST CACHE SETUP ---
+# Each worker keeps users' watchlists in memory, tagged with the version they were read at.
+# Writes bump the user's version (shared through SQLite when CACHE_BACKEND is "sqlite"),
+# so other workers drop their copy on the next read. The TTL bounds staleness across hosts.
+WATCHLIST_CACHE_TTL_SECONDS = float(os.getenv("WATCHLIST_CACHE_TTL_SECONDS", "300"))  # 5 minutes
+WATCHLIST_CACHE_MAX_ENTRIES = int(os.getenv("WATCHLIST_CACHE_MAX_ENTRIES", "10000"))
+
+class WatchlistCache:
+    """
+    Per-user watchlist read cache, updated write-through by the watchlist endpoints.
+    """
+
+    def __init__(self, versions, ttl_seconds: float, max_entries: int):
+        self.versions = versions
+        self.ttl_seconds = ttl_seconds
+        self._entries = LRUCache(max_bytes=64 * 1024 * 1024, max_entries=max_entries)
+        self.stale_reads = 0
+
+    def version(self, user_id: int) -> int | None:
+        """
+        The user's current version. Read it before querying the database, so a write
+        that lands during the query leaves the stored copy visibly stale. None if the
+        shared version store is busy; set() then stores nothing.
+        """
+        return self.versions.current(user_id)
+
+    def get(self, user_id: int) -> list[WatchlistItemPublic] | None:
+        cached = self._entries.get(user_id)
+        if cached is None:
+            return None
+        version, items = cached
+        current = self.versions.current(user_id)
+        if current is None:
+            # Can't tell whether another worker wrote meanwhile, so read the database
+            return None
+        if version != current:
+            self._entries.delete(user_id)
+            self.stale_reads += 1
+            return None
+        return list(items)
+
+    def set(self, user_id: int, items, version: int | None):
+        if version is None:
+            return
+        self._entries.set(
+            user_id,
+            (version, tuple(WatchlistItemPublic.model_validate(item) for item in items)),
+            self.ttl_seconds,
+        )
+
+    def add_items(self, user_id: int, items):
+        """
+        Bumps the user's version and appends the new items to an up-to-date cached copy.
+        """
+        self._apply(user_id, lambda cached: [*cached, *(WatchlistItemPublic.model_validate(item) for item in items)])
+
+    def remove_symbols(self, user_id: int, symbols: list[str]):
+        """
+        Bumps the user's version and drops the symbols from an up-to-date cached copy.
+        """
+        removed = set(symbols)
+        self._apply(user_id, lambda cached: [item for item in cached if item.symbol not in removed])
+
+    def _apply(self, user_id: int, update):
+        cached = self._entries.get(user_id)
+        version = self.versions.bump(user_id)
+        # Only patch a copy that reflected every earlier write; anything else is re-read.
+        # If the bump didn't go through, other workers' copies stay stale until their TTL.
+        if cached is None or version is None or cached[0] != version - 1:
+            self._entries.delete(user_id)
+            return
+        self.set(user_id, update(cached[1]), version)
+
+    def stats(self) -> dict:
+        return {**self._entries.stats(), "stale_reads": self.stale_reads}
+
+def _create_watchlist_cache() -> WatchlistCache:
+    if CACHE_BACKEND == "sqlite":
+        versions = SQLiteVersionCounter(CACHE_SQLITE_PATH, table="watchlist_versions")
+    else:
+        versions = VersionCounter()
+    return WatchlistCache(versions, ttl_seconds=WATCHLIST_CACHE_TTL_SECONDS, max_entries=WATCHLIST_CACHE_MAX_ENTRIES)
+
+watchlist_cache = _create_watchlist_cache()
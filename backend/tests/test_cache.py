@@ -0,0 +1,93 @@
+import os
+import sqlite3
+import stat
+import time
+
+import pytest
+
+from services.cache import SQLiteCache, SQLiteVersionCounter
+from services.watchlist_cache import WatchlistCache
+
+def _cache(tmp_path, **options) -> SQLiteCache:
+    return SQLiteCache(str(tmp_path / "cache.sqlite"), max_bytes=options.pop("max_bytes", 1 << 20),
+                       max_entries=options.pop("max_entries", 1000), **options)
+
+def _hold_write_lock(tmp_path) -> sqlite3.Connection:
+    other_process = sqlite3.connect(str(tmp_path / "cache.sqlite"), isolation_level=None)
+    other_process.execute("BEGIN IMMEDIATE")
+    return other_process
+
+def test_reads_are_served_while_another_process_holds_the_write_lock(tmp_path):
+    cache = _cache(tmp_path)
+    cache.set("AAPL", {"price": 1.0}, ttl_seconds=60)
+    # Every read is due an accessed_at update, which used to be written (and block) inline
+    cache.ACCESS_RESOLUTION_SECONDS = -1
+    lock = _hold_write_lock(tmp_path)
+    try:
+        started = time.perf_counter()
+        assert cache.get("AAPL") == {"price": 1.0}
+        assert time.perf_counter() - started < 1
+    finally:
+        lock.rollback()
+    assert cache.lock_timeouts == 0
+
+def test_contended_write_is_skipped_instead_of_blocking(tmp_path):
+    cache = _cache(tmp_path)
+    lock = _hold_write_lock(tmp_path)
+    try:
+        started = time.perf_counter()
+        cache.set("AAPL", {"price": 1.0}, ttl_seconds=60)
+        assert time.perf_counter() - started < 1
+    finally:
+        lock.rollback()
+    assert cache.lock_timeouts == 1
+    assert cache.get("AAPL") is None
+
+def test_prune_evicts_least_recently_read_entries(tmp_path):
+    cache = _cache(tmp_path, max_entries=10)
+    for i in range(10):
+        cache.set(f"K{i}", i, ttl_seconds=60)
+    cache.ACCESS_RESOLUTION_SECONDS = -1
+    assert cache.get("K0") == 0
+    cache.set("K10", 10, ttl_seconds=60)
+
+    cache.prune()
+
+    assert len(cache) == 9
+    assert cache.get("K0") == 0
+    assert cache.get("K1") is None
+
+def test_version_counter_reports_unknown_instead_of_blocking_when_locked(tmp_path):
+    versions = SQLiteVersionCounter(str(tmp_path / "cache.sqlite"), table="versions")
+    assert versions.bump(1) == 1
+    lock = _hold_write_lock(tmp_path)
+    try:
+        started = time.perf_counter()
+        assert versions.bump(1) is None
+        assert time.perf_counter() - started < 1
+        assert versions.current(1) == 1  # WAL readers aren't blocked by the writer
+    finally:
+        lock.rollback()
+    assert versions.bump(1) == 2
+
+def test_watchlist_cache_drops_its_copy_when_the_version_bump_is_locked_out(tmp_path):
+    cache = WatchlistCache(SQLiteVersionCounter(str(tmp_path / "cache.sqlite"), table="versions"),
+                           ttl_seconds=60, max_entries=10)
+    cache.set(1, [{"id": 1, "symbol": "AAPL", "user_id": 1}], cache.version(1))
+    lock = _hold_write_lock(tmp_path)
+    try:
+        cache.add_items(1, [{"id": 2, "symbol": "MSFT", "user_id": 1}])
+    finally:
+        lock.rollback()
+    assert cache.get(1) is None
+
+def test_refuses_a_cache_file_in_a_directory_others_can_write(tmp_path):
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    shared.chmod(0o777)
+    with pytest.raises(RuntimeError):
+        SQLiteCache(str(shared / "cache.sqlite"), max_bytes=1 << 20, max_entries=10)
+
+def test_creates_the_cache_directory_owner_only(tmp_path):
+    _cache(tmp_path / "private")
+    assert stat.S_IMODE(os.stat(tmp_path / "private").st_mode) == 0o700
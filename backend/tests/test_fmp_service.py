@@ -0,0 +1,29 @@
+import asyncio
+
+from services import fmp_service
+
+def _fake_batch_quotes(monkeypatch, reply):
+    async def get_json(url: str, dataset: str = "other"):
+        symbols = url.split("/quote/")[1].split("?")[0].split(",")
+        return reply(symbols)
+
+    monkeypatch.setattr(fmp_service, "FMP_API_KEY", "test")
+    monkeypatch.setattr(fmp_service.fmp_client, "get_json", get_json)
+    monkeypatch.setattr(fmp_service, "_negative_cache", fmp_service.LRUCache(max_bytes=1024 * 1024, max_entries=100))
+
+def test_empty_batch_reply_is_not_cached_as_not_found(monkeypatch):
+    _fake_batch_quotes(monkeypatch, lambda symbols: [])
+
+    results = asyncio.run(fmp_service.fetch_batch_quotes(["ZZEMPTA", "ZZEMPTB"]))
+
+    assert all(fmp_service.is_error(result) for result in results.values())
+    assert not any(isinstance(result, fmp_service.NotFoundResult) for result in results.values())
+    assert len(fmp_service._negative_cache) == 0
+
+def test_symbol_missing_from_an_answered_batch_is_cached_as_not_found(monkeypatch):
+    _fake_batch_quotes(monkeypatch, lambda symbols: [{"symbol": "ZZREALA", "price": 1.0}])
+
+    results = asyncio.run(fmp_service.fetch_batch_quotes(["ZZREALA", "ZZGONEA"]))
+
+    assert isinstance(results["ZZGONEA"], fmp_service.NotFoundResult)
+    assert len(fmp_service._negative_cache) == 1
@@ -0,0 +1,39 @@
+import asyncio
+import os
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.password_hasher import PasswordHasher
+from app.core.security import verify_password
+
+def test_failed_operations_are_not_counted_as_completed():
+    async def scenario():
+        hasher = PasswordHasher(workers=1, max_queue=1)
+        try:
+            with pytest.raises(ValueError):
+                await hasher._run(int, "not a number")
+            await hasher._run(int, "1")
+        finally:
+            hasher.shutdown()
+        return hasher.stats()
+
+    stats = asyncio.run(scenario())
+    assert (stats["completed"], stats["failed"]) == (1, 1)
+
+def test_broken_pool_is_replaced():
+    async def scenario():
+        hasher = PasswordHasher(workers=1, max_queue=1)
+        try:
+            # Kills the worker, breaking the pool on the first try and on the retry
+            with pytest.raises(HTTPException) as refused:
+                await hasher._run(os._exit, 1)
+            hashed = await hasher.hash("secret1")
+        finally:
+            hasher.shutdown()
+        return refused.value.status_code, hashed, hasher.stats()
+
+    status_code, hashed, stats = asyncio.run(scenario())
+    assert status_code == 503
+    assert verify_password("secret1", hashed)
+    assert (stats["completed"], stats["failed"]) == (1, 1)
@@ -0,0 +1,61 @@
+import asyncio
+import time
+
+import pytest
+
+from services.quota import Priority, QuotaExceeded, QuotaManager
+
+async def _acquire_until_refused(quota: QuotaManager, level: Priority) -> int:
+    granted = 0
+    with pytest.raises(QuotaExceeded):
+        while True:
+            await quota.acquire(level)
+            granted += 1
+    return granted
+
+def test_background_calls_leave_the_daily_reserve_to_interactive_ones():
+    async def scenario():
+        quota = QuotaManager(per_minute=300, per_day=125)
+        background = await _acquire_until_refused(quota, Priority.BACKGROUND)
+        skipped = not quota.has_budget(Priority.BACKGROUND)
+        interactive = await _acquire_until_refused(quota, Priority.INTERACTIVE)
+        return background, skipped, interactive
+
+    background, skipped, interactive = asyncio.run(scenario())
+    assert background < 125
+    assert skipped
+    assert background + interactive == 125
+
+def _half_open(quota: QuotaManager):
+    quota.breaker.record_throttled(time.monotonic())
+    quota.breaker.open_until = time.monotonic() - 1
+
+def test_caller_refused_for_budget_does_not_keep_the_half_open_probe():
+    async def scenario():
+        quota = QuotaManager(per_minute=300, per_day=125)
+        _half_open(quota)
+        quota.day_bucket.tokens = 5  # Under the bulk reserve
+        with pytest.raises(QuotaExceeded):
+            await quota.acquire(Priority.BULK)
+
+        quota.day_bucket.tokens = quota.day_bucket.capacity
+        await quota.acquire(Priority.INTERACTIVE)
+        with pytest.raises(QuotaExceeded):
+            await quota.acquire(Priority.INTERACTIVE)  # The probe is now out; the rest wait for its result
+        quota.record_result(throttled=False)
+        await quota.acquire(Priority.INTERACTIVE)
+        return quota.breaker.state
+
+    assert asyncio.run(scenario()) == "closed"
+
+def test_failed_probe_neither_closes_the_circuit_nor_keeps_the_probe():
+    async def scenario():
+        quota = QuotaManager(per_minute=300, per_day=125)
+        _half_open(quota)
+        await quota.acquire(Priority.INTERACTIVE)
+        quota.record_result(throttled=False, succeeded=False)  # e.g. a timeout
+        state_after_failure = quota.breaker.state
+        await quota.acquire(Priority.INTERACTIVE)  # The next call gets to probe
+        return state_after_failure
+
+    assert asyncio.run(scenario()) == "half_open"
@@ -0,0 +1,96 @@
+import asyncio
+from types import SimpleNamespace
+
+from services import quota, quote_stream
+from services.quote_stream import QuoteHub
+
+# More than the old fixed queue size of 100, and as many as one stream may request
+SYMBOLS = [f"SYM{i}" for i in range(200)]
+
+def _fake_fetch(prices: dict):
+    async def fetch_global_quote(symbol: str):
+        return SimpleNamespace(symbol=symbol, price=prices.get(symbol, 1.0))
+    return fetch_global_quote
+
+async def _drain(queue, count: int) -> list[dict]:
+    return [await asyncio.wait_for(queue.get(), timeout=1) for _ in range(count)]
+
+def test_first_subscriber_receives_every_initial_quote(monkeypatch):
+    monkeypatch.setattr(quote_stream.fmp_service, "fetch_global_quote", _fake_fetch({}))
+
+    async def scenario():
+        hub = QuoteHub(poll_seconds=60)
+        queue = hub.subscribe(SYMBOLS)
+        await asyncio.sleep(0)  # let every poller publish once before the client reads
+        updates = await _drain(queue, len(SYMBOLS))
+        hub.unsubscribe(queue, SYMBOLS)
+        await hub.close()
+        return updates
+
+    updates = asyncio.run(scenario())
+    assert sorted(update["symbol"] for update in updates) == sorted(SYMBOLS)
+
+def test_subscribe_with_more_cached_symbols_than_old_queue_size(monkeypatch):
+    monkeypatch.setattr(quote_stream.fmp_service, "fetch_global_quote", _fake_fetch({}))
+
+    async def scenario():
+        hub = QuoteHub(poll_seconds=60)
+        first = hub.subscribe(SYMBOLS)
+        await _drain(first, len(SYMBOLS))
+
+        second = hub.subscribe(SYMBOLS)
+        snapshot = await _drain(second, len(SYMBOLS))
+
+        hub.unsubscribe(first, SYMBOLS)
+        hub.unsubscribe(second, SYMBOLS)
+        stats = hub.stats()
+        await hub.close()
+        return snapshot, stats
+
+    snapshot, stats = asyncio.run(scenario())
+    assert sorted(update["symbol"] for update in snapshot) == sorted(SYMBOLS)
+    assert stats == {"symbols": 0, "subscriptions": 0}
+
+def test_slow_subscriber_keeps_only_newest_update_per_symbol(monkeypatch):
+    prices = {}
+    monkeypatch.setattr(quote_stream.fmp_service, "fetch_global_quote", _fake_fetch(prices))
+
+    async def scenario():
+        hub = QuoteHub(poll_seconds=0)
+        queue = hub.subscribe(SYMBOLS)
+        for price in (2.0, 3.0, 4.0):
+            prices.update(dict.fromkeys(SYMBOLS, price))
+            await asyncio.sleep(0.01)
+        pending = queue.qsize()
+        updates = await _drain(queue, pending)
+        hub.unsubscribe(queue, SYMBOLS)
+        await hub.close()
+        return pending, updates
+
+    pending, updates = asyncio.run(scenario())
+    assert pending == len(SYMBOLS)
+    assert all(update["quote"].price == 4.0 for update in updates)
+
+def test_pollers_run_at_background_priority_and_pause_without_budget(monkeypatch):
+    seen_priorities = []
+
+    async def fetch_global_quote(symbol: str):
+        seen_priorities.append(quota.current_priority.get())
+        return SimpleNamespace(symbol=symbol, price=1.0)
+
+    monkeypatch.setattr(quote_stream.fmp_service, "fetch_global_quote", fetch_global_quote)
+
+    async def scenario():
+        hub = QuoteHub(poll_seconds=0.01)
+        queue = hub.subscribe(["AAPL"])
+        await _drain(queue, 1)
+        monkeypatch.setattr(quote_stream.fmp_quota, "has_budget", lambda level: False)
+        polls = len(seen_priorities)
+        await asyncio.sleep(0.1)
+        paused_polls = len(seen_priorities) - polls
+        hub.unsubscribe(queue, ["AAPL"])
+        await hub.close()
+        return paused_polls
+
+    assert asyncio.run(scenario()) <= 1
+    assert set(seen_priorities) == {quota.Priority.BACKGROUND}
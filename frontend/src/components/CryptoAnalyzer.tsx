@@ -53,32 +53,19 @@ const CryptoAnalyzer: React.FC = () => {
         'Content-Type': 'application/json',
       };
 
-      // Fetch Quote
-      const stockResponse = await fetch(`${API_BASE_URL}/api/v1/stock/${normalized}`, { headers });
-      if (!stockResponse.ok) {
-        const errorData = await stockResponse.json();
+      // Fetch quote, company profile and key metrics in one round trip
+      const snapshotResponse = await fetch(`${API_BASE_URL}/api/v1/snapshot/${normalized}`, { headers });
+      if (!snapshotResponse.ok) {
+        const errorData = await snapshotResponse.json();
         throw new Error(errorData.detail || 'Failed to fetch quote. Please check the symbol and try again.');
       }
-      const stockQuoteData = await stockResponse.json();
-      setStockData(stockQuoteData);
-
-      // Fetch Company Profile
-      const profileResponse = await fetch(`${API_BASE_URL}/api/v1/profile/${normalized}`, { headers });
-      if (!profileResponse.ok) {
-        setCompanyProfile(null);
-      } else {
-        const companyProfileData = await profileResponse.json();
-        setCompanyProfile(companyProfileData);
-      }
-
-      // Fetch Key Metrics
-      const keyMetricsResponse = await fetch(`${API_BASE_URL}/api/v1/key-metrics/${normalized}`, { headers });
-      if (!keyMetricsResponse.ok) {
-        setKeyMetrics(null);
-      } else {
-        const keyMetricsData = await keyMetricsResponse.json();
-        setKeyMetrics(keyMetricsData);
+      const snapshotData = await snapshotResponse.json();
+      if (!snapshotData.quote) {
+        throw new Error(snapshotData.errors?.quote || 'Failed to fetch quote. Please check the symbol and try again.');
       }
+      setStockData(snapshotData.quote);
+      setCompanyProfile(snapshotData.profile);
+      setKeyMetrics(snapshotData.key_metrics);
     } catch (err: any) {
       setError(err.message || "An unexpected error occurred during data fetching.");
       setStockData(null);
@@ -64,34 +64,27 @@ const StockAnalyzer: React.FC<StockAnalyzerProps> = ({ authToken, currentUserId,
         'Content-Type': 'application/json',
       };
 
-     // Fetch Stock Quote
-      const stockResponse = await fetch(`${API_BASE_URL}/api/v1/stock/${normalizedSymbol}`, { headers });
-      if (!stockResponse.ok) {
-        const errorData = await stockResponse.json();
+      // Fetch quote, company profile and key metrics in one round trip
+      const snapshotResponse = await fetch(`${API_BASE_URL}/api/v1/snapshot/${normalizedSymbol}`, { headers });
+      if (!snapshotResponse.ok) {
+        const errorData = await snapshotResponse.json();
         throw new Error(errorData.detail || 'Failed to fetch stock quote. Please check the symbol and try again.');
       }
-      const stockQuoteData = await stockResponse.json();
-      setStockData(stockQuoteData);
-
-      // Fetch Company Profile
-      const profileResponse = await fetch(`${API_BASE_URL}/api/v1/profile/${normalizedSymbol}`, { headers });
-      if (!profileResponse.ok) {
-          console.error("Failed to fetch company profile:", await profileResponse.json());
-          setCompanyProfile(null); 
-      } else {
-          const companyProfileData = await profileResponse.json();
-          setCompanyProfile(companyProfileData);
+      const snapshotData = await snapshotResponse.json();
+      if (!snapshotData.quote) {
+        throw new Error(snapshotData.errors?.quote || 'Failed to fetch stock quote. Please check the symbol and try again.');
       }
+      setStockData(snapshotData.quote);
 
-      // Fetch Key Metrics
-      const keyMetricsResponse = await fetch(`${API_BASE_URL}/api/v1/key-metrics/${normalizedSymbol}`, { headers });
-      if (!keyMetricsResponse.ok) {
-          console.error("Failed to fetch key metrics:", await keyMetricsResponse.json());
-          setKeyMetrics(null);
-      } else {
-          const keyMetricsData = await keyMetricsResponse.json();
-          setKeyMetrics(keyMetricsData);
+      if (!snapshotData.profile) {
+          console.error("Failed to fetch company profile:", snapshotData.errors?.profile);
       }
+      setCompanyProfile(snapshotData.profile);
+
+      if (!snapshotData.key_metrics) {
+          console.error("Failed to fetch key metrics:", snapshotData.errors?.key_metrics);
+      }
+      setKeyMetrics(snapshotData.key_metrics);
 
       setSymbol(normalizedSymbol);
 